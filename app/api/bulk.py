@@ -0,0 +1,279 @@
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db import models
+from app.db.outbox import record_upserts
+from app.services.gong_service import batched
+
+# Most records one bulk request may hold; larger imports are sent in parts.
+BULK_MAX_RECORDS = int(os.getenv("BULK_MAX_RECORDS", "10000"))
+# Number of keys or IDs looked up per query while checking a batch.
+BULK_LOOKUP_BATCH_SIZE = 5000
+# Queries one lookup over the largest request takes, for the routes' budgets.
+BULK_LOOKUP_QUERIES = -(-BULK_MAX_RECORDS // BULK_LOOKUP_BATCH_SIZE)
+
+CREATED = "created"
+UPDATED = "updated"
+FAILED = "error"
+
+
+def record_result(index, status, id=None, detail=None):
+    return {"index": index, "status": status, "id": id, "detail": detail}
+
+
+def validate_records(records, schema, key=None):
+    """
+    Validate `records` against `schema` in one pass.
+
+    Returns the valid records by their index in `records`, and the error
+    results of the others by index. A record repeating the `key` of an earlier
+    one is an error, so each row is written once and has a single result.
+    """
+    if len(records) > BULK_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BULK_MAX_RECORDS} records are accepted per request",
+        )
+    valid = {}
+    results = {}
+    seen = set()
+    for index, record in enumerate(records):
+        try:
+            item = schema.model_validate(record)
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in e.errors()
+            )
+            results[index] = record_result(index, FAILED, detail=detail)
+            continue
+        if key is not None:
+            value = getattr(item, key)
+            if value in seen:
+                results[index] = record_result(
+                    index, FAILED, detail=f"Duplicate {key} {value} in request"
+                )
+                continue
+            seen.add(value)
+        valid[index] = item
+    return valid, results
+
+
+def lookup(db, column, values, *columns):
+    """Select `columns` of the rows whose `column` is in `values`, a batch at a time."""
+    rows = []
+    for batch in batched(sorted(values), BULK_LOOKUP_BATCH_SIZE):
+        rows += db.execute(select(*columns).where(column.in_(batch))).all()
+    return rows
+
+
+def check_references(db, model, valid, results):
+    """
+    Move the valid records referencing rows that do not exist to the errors.
+
+    The IDs of each foreign key of `model` are looked up a batch at a time, so
+    a bad reference fails its own record rather than the whole transaction.
+    """
+    for foreign_key in model.__table__.foreign_keys:
+        column = foreign_key.parent
+        ids = {getattr(item, column.name, None) for item in valid.values()}
+        ids.discard(None)
+        existing = {
+            value for value, in lookup(db, foreign_key.column, ids, foreign_key.column)
+        }
+        for index, item in list(valid.items()):
+            value = getattr(item, column.name, None)
+            if value in existing or (value is None and column.nullable):
+                continue
+            if value is None:
+                detail = f"{column.name} is required"
+            else:
+                detail = f"{column.name} {value} does not exist"
+            del valid[index]
+            results[index] = record_result(index, FAILED, detail=detail)
+
+
+# INSERT constructs supporting ON CONFLICT DO UPDATE, by dialect name.
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_insert(db, table):
+    """
+    Return an INSERT into `table` for the database `db` is bound to.
+
+    Bulk writes rely on INSERT ... ON CONFLICT, so other databases are
+    refused rather than written to with the wrong statements.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise HTTPException(
+            status_code=501,
+            detail=f"Bulk writes are not supported on {dialect} databases",
+        )
+    return UPSERT_INSERTS[dialect](table)
+
+
+def upsert_records(db, model, valid, results, key=None, exclude=None):
+    """
+    Write the `valid` records of `model` with one executemany statement.
+
+    Without `key` every record is inserted. With it, a record whose `key`
+    matches an existing row updates that row instead, through INSERT ... ON
+    CONFLICT DO UPDATE. Adds the result of each record to `results` and
+    returns the row ID of each by index.
+    """
+    if not valid:
+        return {}
+    indexes = list(valid)
+    rows = [valid[index].model_dump(exclude=exclude) for index in indexes]
+    table = model.__table__
+    statement = upsert_insert(db, table)
+    if key is None:
+        existing = set()
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite can only RETURN the IDs in parameter order one row at a
+            # time, so the rows are inserted as one executemany and their IDs
+            # read back afterwards. SQLite numbers each new row after the
+            # largest ID, and the transaction has held the write lock since the
+            # INSERT, so the newest IDs are the inserted rows' in order.
+            db.execute(statement, rows)
+            ids = sorted(
+                db.scalars(
+                    select(table.c.id).order_by(table.c.id.desc()).limit(len(rows))
+                )
+            )
+        else:
+            ids = db.scalars(
+                statement.returning(table.c.id, sort_by_parameter_order=True), rows
+            ).all()
+    else:
+        keys = [row[key] for row in rows]
+        existing = {value for value, in lookup(db, table.c[key], keys, table.c[key])}
+        updates = {name: statement.excluded[name] for name in rows[0] if name != key}
+        # Python-side onupdate defaults are not applied to ON CONFLICT updates.
+        updates["updated_at"] = statement.excluded.updated_at
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c[key]], set_=updates
+            ),
+            rows,
+        )
+        ids_by_key = dict(lookup(db, table.c[key], keys, table.c[key], table.c.id))
+        ids = [ids_by_key[value] for value in keys]
+    for index, row, object_id in zip(indexes, rows, ids):
+        status = UPDATED if key is not None and row[key] in existing else CREATED
+        results[index] = record_result(index, status, id=object_id)
+    record_upserts(db, model, ids)
+    return dict(zip(indexes, ids))
+
+
+def check_company_domains(valid, results):
+    """
+    Move the valid companies whose domains cannot be written to the errors.
+
+    A domain belongs to a single company, so a company listing a domain that
+    an earlier record listed fails. So do the companies past the first
+    BULK_MAX_RECORDS domains of the request.
+    """
+    owners = {}
+    for index, company in list(valid.items()):
+        names = {domain.name for domain in company.domains}
+        repeated = sorted(name for name in names if name in owners)
+        if repeated:
+            detail = (
+                f"Domain {repeated[0]} is also listed by record {owners[repeated[0]]}"
+            )
+        elif len(owners) + len(names) > BULK_MAX_RECORDS:
+            detail = f"At most {BULK_MAX_RECORDS} domains are accepted per request"
+        else:
+            owners.update(dict.fromkeys(names, index))
+            continue
+        del valid[index]
+        results[index] = record_result(index, FAILED, detail=detail)
+
+
+def upsert_company_domains(db, valid, company_ids):
+    """
+    Upsert the domains of the `valid` companies by domain name.
+
+    A domain already held by another company moves to the one listed with it,
+    and both companies are marked as changed and queued for Gong. Domains not
+    listed are kept. Each domain must be listed by one company at most, which
+    check_company_domains ensures.
+    """
+    domains = {
+        domain.name: company_ids[index]
+        for index, company in valid.items()
+        for domain in company.domains
+    }
+    if not domains:
+        return
+    previous_company_ids = {
+        company_id
+        for company_id, in lookup(
+            db, models.Domain.name, domains, models.Domain.company_id
+        )
+    }
+    statement = upsert_insert(db, models.Domain.__table__)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[models.Domain.name],
+            set_={
+                "company_id": statement.excluded.company_id,
+                "updated_at": statement.excluded.updated_at,
+            },
+        ),
+        [
+            {"name": name, "company_id": company_id}
+            for name, company_id in domains.items()
+        ],
+    )
+    moved_from = sorted(previous_company_ids - set(company_ids.values()))
+    for batch in batched(moved_from, BULK_LOOKUP_BATCH_SIZE):
+        db.execute(
+            update(models.Company.__table__)
+            .where(models.Company.id.in_(batch))
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+    record_upserts(db, models.Company, moved_from)
+
+
+def bulk_query_budget(model, key=None):
+    """
+    Most SQL statements a bulk_upsert of `model` runs, authentication included.
+
+    Each reference check, and with a `key` the lookups of existing keys and of
+    the written IDs, takes up to BULK_LOOKUP_QUERIES queries. The rest do not
+    grow with the records: authentication, the write, the outbox entries and,
+    without a key on SQLite, reading back the new IDs.
+    """
+    lookups = len(model.__table__.foreign_keys) + (2 if key is not None else 0)
+    return lookups * BULK_LOOKUP_QUERIES + (3 if key is not None else 4)
+
+
+def bulk_response(results):
+    results = [results[index] for index in sorted(results)]
+    counts = Counter(result["status"] for result in results)
+    return {
+        "created": counts[CREATED],
+        "updated": counts[UPDATED],
+        "failed": counts[FAILED],
+        "results": results,
+    }
+
+
+def bulk_upsert(db, model, schema, records, key=None):
+    """
+    Validate `records` and write the valid ones in a single transaction.
+
+    Returns a summary and the result of each record, in request order.
+    """
+    valid, results = validate_records(records, schema, key)
+    check_references(db, model, valid, results)
+    upsert_records(db, model, valid, results, key)
+    db.commit()
+    return bulk_response(results)
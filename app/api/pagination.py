@@ -0,0 +1,48 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException
+
+# Response header holding the cursor of the page after the one returned. It is
+# only set when the page is full, so a missing header means the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key):
+    """Return an opaque, URL-safe cursor for a page starting after `key`."""
+    return base64.urlsafe_b64encode(json.dumps([key]).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (key,) = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def paginate(query, key, response, skip=0, limit=100, cursor=None, descending=False):
+    """
+    Return a page of `query` ordered by the indexed column `key`.
+
+    With `cursor`, the page starts right after the row the cursor was issued
+    for, so the database seeks to it through the index and every page costs
+    the same. `skip` is still applied for clients paging by offset. When the
+    page is full, the cursor of the next page is set on `response` in the
+    X-Next-Cursor header.
+    """
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        query = query.filter(key < after if descending else key > after)
+    query = query.order_by(key.desc() if descending else key)
+    if skip:
+        query = query.offset(skip)
+    items = query.limit(limit).all()
+    if limit > 0 and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(items[-1], key.key)
+        )
+    return items
@@ -0,0 +1,80 @@
+import logging
+from starlette.datastructures import MutableHeaders
+from app.db.database import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(statements):
+    """
+    Declare the most SQL statements a route may execute per request.
+
+    Budgets include the statements of the route's dependencies, such as
+    authentication, and must not grow with the number of rows returned.
+    Requests going over their route's budget are logged as errors, and
+    tests/test_query_budgets.py fails on them. A budget of None exempts a
+    route from both, and is only accepted for the routes that test lists.
+    """
+
+    def declare(endpoint):
+        endpoint.query_budget = statements
+        return endpoint
+
+    return declare
+
+
+class QueryTimingMiddleware:
+    """
+    ASGI middleware reporting the database work of each request.
+
+    The number of statements a request executed and the time they took are
+    returned in a Server-Timing header, which browser developer tools show
+    alongside the request. Statements run repeatedly within one request,
+    usually a lazy load inside a loop, are logged as suspected N+1 queries.
+    Statements run after the response headers were sent, such as those of a
+    streaming response, are not counted. Requests running more statements
+    than their route's `query_budget` are logged as errors.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    repeated = stats.repeated()
+                    timings = [
+                        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                    ]
+                    if repeated:
+                        timings.append(f'db-n1;desc="{len(repeated)} repeated"')
+                        for statement, count in repeated.items():
+                            logger.warning(
+                                "Suspected N+1 in %s %s: %d executions of %s",
+                                scope["method"],
+                                scope["path"],
+                                count,
+                                statement,
+                            )
+                    # The router sets the matched endpoint on the scope.
+                    budget = getattr(scope.get("endpoint"), "query_budget", None)
+                    if budget is not None and stats.count > budget:
+                        logger.error(
+                            "%s %s ran %d SQL statements, over its budget of %d",
+                            scope["method"],
+                            scope["path"],
+                            stats.count,
+                            budget,
+                        )
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", ", ".join(timings)
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
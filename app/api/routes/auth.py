@@ -3,12 +3,14 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.api import schemas, security
+from app.api.query_timing import query_budget
 from app.db import database
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=schemas.Token)
+@query_budget(1)
 def login_for_access_token(
     db: Session = Depends(database.get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -32,6 +34,7 @@ def login_for_access_token(
 
 
 @router.post("/token/verify", response_model=schemas.User)
+@query_budget(1)
 def verify_access_token(
     db: Session = Depends(database.get_db),
     current_user: schemas.User = Depends(security.get_current_user),
@@ -40,6 +43,7 @@ def verify_access_token(
 
 
 @router.post("/token/refresh", response_model=schemas.Token)
+@query_budget(1)
 def refresh_token(
     db: Session = Depends(database.get_db),
     current_user: schemas.User = Depends(security.get_current_user),
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.orm import Session, selectinload
 from app.db.database import get_db
 from app.api import schemas
+from app.api.bulk import (
+    BULK_LOOKUP_QUERIES,
+    bulk_query_budget,
+    bulk_response,
+    check_company_domains,
+    upsert_company_domains,
+    upsert_records,
+    validate_records,
+)
+from app.api.pagination import paginate
 from app.db import models
 from app.api.security import get_current_active_user
+from app.api.query_timing import query_budget
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Company)
+@query_budget(10)
 def create_company(
     company: schemas.CompanyCreate,
     db: Session = Depends(get_db),
@@ -37,18 +51,49 @@ def create_company(
     return new_company
 
 
+@router.post("/bulk", response_model=schemas.BulkResponse)
+# Domains add the lookup of their previous companies, the touch of those they
+# move from, their upsert and the outbox entries of the companies left.
+@query_budget(bulk_query_budget(models.Company, "name") + 2 * BULK_LOOKUP_QUERIES + 2)
+def bulk_upsert_companies(
+    companies: list[dict],
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_active_user),
+):
+    # Companies are matched by name and their domains by domain name.
+    valid, results = validate_records(companies, schemas.CompanyCreate, "name")
+    check_company_domains(valid, results)
+    company_ids = upsert_records(
+        db, models.Company, valid, results, "name", exclude={"domains"}
+    )
+    upsert_company_domains(db, valid, company_ids)
+    db.commit()
+    return bulk_response(results)
+
+
 @router.get("/", response_model=list[schemas.Company])
+@query_budget(3)
 def read_companies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    companies = db.query(models.Company).offset(skip).limit(limit).all()
+    companies = paginate(
+        db.query(models.Company).options(selectinload(models.Company.domains)),
+        models.Company.id,
+        response,
+        skip,
+        limit,
+        cursor,
+    )
     return companies
 
 
 @router.get("/{company_id}", response_model=schemas.Company)
+@query_budget(3)
 def read_company(
     company_id: int,
     db: Session = Depends(get_db),
@@ -61,24 +106,31 @@ def read_company(
 
 
 @router.get("/industry/{industry}", response_model=list[schemas.Company])
+@query_budget(3)
 def read_companies_by_industry(
     industry: schemas.IndustryEnum,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    companies = (
+    companies = paginate(
         db.query(models.Company)
-        .filter(models.Company.industry == industry)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .options(selectinload(models.Company.domains))
+        .filter(models.Company.industry == industry),
+        models.Company.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return companies
 
 
 @router.put("/{company_id}", response_model=schemas.Company)
+@query_budget(7)
 def update_company(
     company_id: int,
     company: schemas.CompanyUpdate,
@@ -93,12 +145,14 @@ def update_company(
 
     for key, value in company.model_dump(exclude_unset=True).items():
         if key == "domains":
-            # Clear existing domains
+            # Clear existing domains. The bulk delete skips session events, so
+            # the company is marked as changed here for watermark syncs.
             db.query(models.Domain).filter(
                 models.Domain.company_id == company_id
             ).delete()
+            db_company.updated_at = datetime.now(timezone.utc)
             # Add new domains
-            for domain in value:
+            for domain in company.domains:
                 new_domain = models.Domain(name=domain.name, company_id=company_id)
                 db.add(new_domain)
         else:
@@ -110,6 +164,7 @@ def update_company(
 
 
 @router.delete("/{company_id}", response_model=schemas.Company)
+@query_budget(8)
 def delete_company(
     company_id: int,
     db: Session = Depends(get_db),
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.api import schemas
+from app.api.bulk import bulk_query_budget, bulk_upsert
+from app.api.pagination import paginate
 from app.db import models
 from app.api.security import get_current_active_user
+from app.api.query_timing import query_budget
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Contact)
+@query_budget(5)
 def create_contact(
     contact: schemas.ContactCreate,
     db: Session = Depends(get_db),
@@ -26,36 +31,57 @@ def create_contact(
     return new_contact
 
 
+@router.post("/bulk", response_model=schemas.BulkResponse)
+@query_budget(bulk_query_budget(models.Contact, "email"))
+def bulk_upsert_contacts(
+    contacts: list[dict],
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_active_user),
+):
+    # Contacts are matched by email; existing ones are updated in place.
+    return bulk_upsert(db, models.Contact, schemas.ContactCreate, contacts, "email")
+
+
 @router.get("/", response_model=list[schemas.Contact])
+@query_budget(2)
 def read_contacts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    contacts = db.query(models.Contact).offset(skip).limit(limit).all()
+    contacts = paginate(
+        db.query(models.Contact), models.Contact.id, response, skip, limit, cursor
+    )
     return contacts
 
 
 @router.get("/company/{company_id}", response_model=list[schemas.Contact])
+@query_budget(2)
 def read_contacts_by_company(
     company_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    contacts = (
-        db.query(models.Contact)
-        .filter(models.Contact.company_id == company_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    contacts = paginate(
+        db.query(models.Contact).filter(models.Contact.company_id == company_id),
+        models.Contact.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return contacts
 
 
 @router.get("/{contact_id}", response_model=schemas.Contact)
+@query_budget(2)
 def read_contact(
     contact_id: int,
     db: Session = Depends(get_db),
@@ -68,6 +94,7 @@ def read_contact(
 
 
 @router.put("/{contact_id}", response_model=schemas.Contact)
+@query_budget(5)
 def update_contact(
     contact_id: int,
     contact: schemas.ContactUpdate,
@@ -87,6 +114,7 @@ def update_contact(
 
 
 @router.delete("/{contact_id}", response_model=schemas.Contact)
+@query_budget(5)
 def delete_contact(
     contact_id: int,
     db: Session = Depends(get_db),
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.api import schemas
+from app.api.bulk import bulk_query_budget, bulk_upsert
+from app.api.pagination import paginate
 from app.db import models
 from app.api.security import get_current_active_user
+from app.api.query_timing import query_budget
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Deal)
+@query_budget(4)
 def create_deal(
     deal: schemas.DealCreate,
     db: Session = Depends(get_db),
@@ -21,90 +26,123 @@ def create_deal(
     return new_deal
 
 
+@router.post("/bulk", response_model=schemas.BulkResponse)
+@query_budget(bulk_query_budget(models.Deal))
+def bulk_create_deals(
+    deals: list[dict],
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_active_user),
+):
+    # Deals have no natural key, so every valid deal is inserted.
+    return bulk_upsert(db, models.Deal, schemas.DealCreate, deals)
+
+
 @router.get("/", response_model=list[schemas.Deal])
+@query_budget(2)
 def read_deals(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    deals = db.query(models.Deal).offset(skip).limit(limit).all()
+    deals = paginate(
+        db.query(models.Deal), models.Deal.id, response, skip, limit, cursor
+    )
     return deals
 
 
 @router.get("/user/{user_id}", response_model=list[schemas.Deal])
+@query_budget(2)
 def read_deals_by_user(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    deals = (
-        db.query(models.Deal)
-        .filter(models.Deal.owner_id == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    deals = paginate(
+        db.query(models.Deal).filter(models.Deal.owner_id == user_id),
+        models.Deal.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return deals
 
 
 @router.get("/company/{company_id}", response_model=list[schemas.Deal])
+@query_budget(2)
 def read_deals_by_company(
     company_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    deals = (
-        db.query(models.Deal)
-        .filter(models.Deal.company_id == company_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    deals = paginate(
+        db.query(models.Deal).filter(models.Deal.company_id == company_id),
+        models.Deal.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return deals
 
 
 @router.get("/stage/{stage}", response_model=list[schemas.Deal])
+@query_budget(2)
 def read_deals_by_stage(
     stage: schemas.StageEnum,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    deals = (
-        db.query(models.Deal)
-        .filter(models.Deal.stage == stage)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    deals = paginate(
+        db.query(models.Deal).filter(models.Deal.stage == stage),
+        models.Deal.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return deals
 
 
 @router.get("/status/{status}", response_model=list[schemas.Deal])
+@query_budget(2)
 def read_deals_by_status(
     status: schemas.StatusEnum,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    deals = (
-        db.query(models.Deal)
-        .filter(models.Deal.status == status)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    deals = paginate(
+        db.query(models.Deal).filter(models.Deal.status == status),
+        models.Deal.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return deals
 
 
 @router.get("/{deal_id}", response_model=schemas.Deal)
+@query_budget(2)
 def read_deal(
     deal_id: int,
     db: Session = Depends(get_db),
@@ -117,6 +155,7 @@ def read_deal(
 
 
 @router.put("/{deal_id}", response_model=schemas.Deal)
+@query_budget(5)
 def update_deal(
     deal_id: int,
     deal: schemas.DealUpdate,
@@ -139,6 +178,7 @@ def update_deal(
 
 
 @router.delete("/{deal_id}", response_model=schemas.Deal)
+@query_budget(5)
 def delete_deal(
     deal_id: int,
     db: Session = Depends(get_db),
@@ -1,10 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.services.gong_service import GongService, GongException
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.services.gong_service import (
+    GongService,
+    GongException,
+    CHUNK_MAX_RECORDS,
+    CHUNK_MAX_BYTES,
+    UPLOAD_CONCURRENCY,
+    SERIALIZE_WORKERS,
+    SYNC_MODELS,
+)
+from app.services import fast_json
+from app.services.async_gong_service import AsyncGongService
+from app.services.gong_jobs import GongJobRunner, GongJobConflict, GongJobNotFound
+from app.services.gong_ledger import GongRequestPoller
+from app.services.gong_outbox import GongOutboxWorker
+from app.services.gong_reconcile import GongReconciler
+from app.services.http_client import get_http_session
+from app.services.sync_metrics import sync_metrics
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import SessionLocal, get_db
 from app.api.security import get_current_active_admin
 from app.api import schemas
+from app.api.pagination import paginate
+from app.api.query_timing import query_budget
+from app.db import models
+import enum
+import itertools
 import os
+from typing import Optional
 
 router = APIRouter()
 
@@ -13,16 +36,71 @@ GONG_ACCESS_KEY = os.getenv("GONG_ACCESS_KEY")
 GONG_ACCESS_KEY_SECRET = os.getenv("GONG_ACCESS_KEY_SECRET")
 credentials = (GONG_ACCESS_KEY, GONG_ACCESS_KEY_SECRET)
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+upload_options = {
+    "chunk_max_records": int(os.getenv("GONG_CHUNK_MAX_RECORDS", CHUNK_MAX_RECORDS)),
+    "chunk_max_bytes": int(os.getenv("GONG_CHUNK_MAX_BYTES", CHUNK_MAX_BYTES)),
+    "upload_concurrency": int(os.getenv("GONG_UPLOAD_CONCURRENCY", UPLOAD_CONCURRENCY)),
+    "serialize_workers": int(os.getenv("GONG_SERIALIZE_WORKERS", SERIALIZE_WORKERS)),
+}
+# Object types a reconciliation may be limited to.
+SyncObjectType = enum.Enum(
+    "SyncObjectType",
+    {object_type: object_type for object_type in SYNC_MODELS},
+    type=str,
+)
+# Most serialization processes a request may ask for, one per core.
+MAX_SERIALIZE_WORKERS = os.cpu_count() or 1
+
+
+def get_gong_service(db: Session = Depends(get_db)):
+    return GongService(
+        GONG_API_URL,
+        credentials,
+        BASE_URL,
+        db,
+        http=get_http_session(),
+        **upload_options,
+    )
+
+
+def create_async_gong_service(progress=None, serialize_workers=None):
+    # `serialize_workers` overrides GONG_SERIALIZE_WORKERS; above 1, tables are
+    # serialized in that many worker processes.
+    options = dict(upload_options)
+    if serialize_workers is not None:
+        options["serialize_workers"] = serialize_workers
+    return AsyncGongService(
+        SessionLocal,
+        GONG_API_URL,
+        credentials,
+        BASE_URL,
+        http=get_http_session(),
+        progress=progress,
+        **options,
+    )
+
+
+def get_async_gong_service(
+    serialize_workers: Optional[int] = Query(None, ge=1, le=MAX_SERIALIZE_WORKERS)
+):
+    # Dependency form of create_async_gong_service; its parameters are read
+    # from the query string, so only request options belong here.
+    return create_async_gong_service(serialize_workers=serialize_workers)
+
+
+job_runner = GongJobRunner(SessionLocal, create_async_gong_service)
+request_poller = GongRequestPoller(SessionLocal, get_gong_service)
+outbox_worker = GongOutboxWorker(SessionLocal, get_gong_service)
 
 
 @router.post("/register_integration", response_model=schemas.IntegrationResponse)
+@query_budget(1)
 def register_integration(
     integration_name: str,
     owner_email: str,
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.register_crm_integration(
             integration_name, owner_email
@@ -33,53 +111,115 @@ def register_integration(
 
 
 @router.post("/update_schema", response_model=schemas.MessageResponse)
+@query_budget(3)
 def update_schema(
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.get_crm_integration()
-        gong_service.register_crm_schema(integration_id)
+        if not gong_service.register_crm_schema(integration_id):
+            return {"message": "Schema is already up to date."}
         return {"message": "Schema updated successfully."}
     except GongException as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/full_db_dump", response_model=schemas.GongUploadMessageResponse)
+@router.post("/full_db_dump", response_model=schemas.GongSyncJob, status_code=202)
+@query_budget(5)
 def full_db_dump(
+    serialize_workers: Optional[int] = Query(None, ge=1, le=MAX_SERIALIZE_WORKERS),
+    resume: Optional[int] = None,
     db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.get_crm_integration()
-        users, companies, contacts, deals, leads = gong_service.fetch_data_from_db()
-
-        responses = {
-            "STAGE": gong_service.push_stages_to_gong(integration_id),
-            "BUSINESS_USER": gong_service.push_users_to_gong(integration_id, users),
-            "ACCOUNT": gong_service.push_companies_to_gong(integration_id, companies),
-            "CONTACT": gong_service.push_contacts_to_gong(integration_id, contacts),
-            "DEAL": gong_service.push_deals_to_gong(integration_id, deals),
-            "LEAD": gong_service.push_leads_to_gong(integration_id, leads),
-        }
+        job_id = job_runner.submit(
+            integration_id,
+            "full_db_dump",
+            resume_job_id=resume,
+            serialize_workers=serialize_workers,
+        )
+        return db.get(models.GongSyncJob, job_id)
+    except GongJobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GongJobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except GongException as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/jobs/{job_id}", response_model=schemas.GongSyncJob)
+@query_budget(2)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_active_admin),
+):
+    job = db.get(models.GongSyncJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/incremental_sync", response_model=schemas.GongUploadMessageResponse)
+@query_budget(None)
+async def incremental_sync(
+    gong_service: AsyncGongService = Depends(get_async_gong_service),
+    current_user: schemas.User = Depends(get_current_active_admin),
+):
+    try:
+        integration_id = await gong_service.get_crm_integration()
+        responses = await gong_service.incremental_sync(integration_id)
         return {
-            "message": "Full database dump completed successfully.",
+            "message": "Incremental sync completed successfully.",
             "responses": responses,
+            "record_stats": gong_service.record_stats,
+            "phase_timings": gong_service.phase_timings,
         }
     except GongException as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+@query_budget(1)
+def read_metrics(current_user: schemas.User = Depends(get_current_active_admin)):
+    # Totals of every push phase timed by this process since it started, in the
+    # Prometheus text format.
+    return sync_metrics.render_prometheus()
+
+
+@router.post("/reconcile", response_model=schemas.GongReconcileResponse)
+@query_budget(None)
+def reconcile(
+    object_type: Optional[SyncObjectType] = None,
+    repair: bool = False,
+    full: bool = False,
+    gong_service: GongService = Depends(get_gong_service),
+    current_user: schemas.User = Depends(get_current_active_admin),
+):
+    try:
+        integration_id = gong_service.get_crm_integration()
+        reports = GongReconciler(gong_service).reconcile(
+            integration_id,
+            [object_type.value] if object_type else None,
+            repair=repair,
+            full=full,
+        )
+        return {"message": "Reconciliation completed successfully.", "reports": reports}
+    except GongException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/view_schema", response_model=schemas.SchemaResponse)
+@query_budget(1)
 def view_schema(
     object_type: str,
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.get_crm_integration()
         schema_fields = gong_service.list_schema_fields(integration_id, object_type)
@@ -89,12 +229,12 @@ def view_schema(
 
 
 @router.get("/check_request_status", response_model=schemas.GongRequestStatusResponse)
+@query_budget(1)
 def check_request_status(
     request_id: str,
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.get_crm_integration()
         status, errors = gong_service.check_request_status(integration_id, request_id)
@@ -103,32 +243,102 @@ def check_request_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/get_crm_objects", response_model=schemas.CrmObjectsResponse)
-def get_crm_objects(
-    object_type: str,
-    object_ids: str,
+@router.get("/requests", response_model=list[schemas.GongRequest])
+@query_budget(2)
+def read_requests(
+    response: Response,
+    status: Optional[str] = None,
+    object_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
+    query = db.query(models.GongRequest)
+    if status is not None:
+        query = query.filter(models.GongRequest.status == status)
+    if object_type is not None:
+        query = query.filter(models.GongRequest.object_type == object_type)
+    # Newest uploads first.
+    requests = paginate(
+        query, models.GongRequest.id, response, skip, limit, cursor, descending=True
+    )
+    return requests
+
+
+def stream_crm_objects(first, responses):
+    # Writes the merged response a batch at a time as batches arrive, without
+    # building or validating it as a whole.
+    yield b'{"requestId":' + fast_json.dumps(first.get("requestId"))
+    yield b',"crmObjectsMap":{'
+    separator = b""
+    for response in itertools.chain([first], responses):
+        crm_objects_map = response.get("crmObjectsMap")
+        if crm_objects_map:
+            # Each batch's map is written without its enclosing braces.
+            yield separator + fast_json.dumps(crm_objects_map)[1:-1]
+            separator = b","
+    yield b"}}"
+
+
+def crm_objects_response(gong_service, object_type, object_ids, raw):
+    # Long ID lists are looked up in concurrent batches. With `raw`, Gong's
+    # objects are streamed back as they are fetched instead of being validated
+    # against CrmObjectsResponse, which is much faster for large lists.
+    if not object_ids:
+        raise HTTPException(status_code=400, detail="object_ids is required")
     try:
         integration_id = gong_service.get_crm_integration()
-        object_ids_list = object_ids.split(",")
-        objects = gong_service.get_crm_objects(
-            integration_id, object_type, object_ids_list
+        if not raw:
+            return gong_service.get_crm_objects(integration_id, object_type, object_ids)
+        responses = gong_service.iter_crm_objects(
+            integration_id, object_type, object_ids
+        )
+        # Fetch the first batch now so a failure is still reported as an error
+        # status; later failures end the stream early.
+        first = next(responses)
+        return StreamingResponse(
+            stream_crm_objects(first, responses), media_type="application/json"
         )
-        return objects
     except GongException as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/get_crm_objects", response_model=schemas.CrmObjectsResponse)
+@query_budget(1)
+def get_crm_objects(
+    object_type: str,
+    object_ids: str,
+    raw: bool = False,
+    gong_service: GongService = Depends(get_gong_service),
+    current_user: schemas.User = Depends(get_current_active_admin),
+):
+    object_ids_list = [object_id for object_id in object_ids.split(",") if object_id]
+    return crm_objects_response(gong_service, object_type, object_ids_list, raw)
+
+
+@router.post("/get_crm_objects", response_model=schemas.CrmObjectsResponse)
+@query_budget(1)
+def get_crm_objects_by_body(
+    request: schemas.CrmObjectsRequest,
+    raw: bool = False,
+    gong_service: GongService = Depends(get_gong_service),
+    current_user: schemas.User = Depends(get_current_active_admin),
+):
+    # ID lists too long for a query string are sent in the body instead.
+    return crm_objects_response(
+        gong_service, request.object_type, request.object_ids, raw
+    )
+
+
 @router.delete("/delete_integration", response_model=schemas.MessageResponse)
+@query_budget(1)
 def delete_integration(
     integration_id: str,
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         gong_service.delete_crm_integration(integration_id)
         return {"message": "Integration deleted successfully."}
@@ -137,11 +347,11 @@ def delete_integration(
 
 
 @router.get("/view_integration_id", response_model=schemas.IntegrationResponse)
+@query_budget(1)
 def view_integration_id(
-    db: Session = Depends(get_db),
+    gong_service: GongService = Depends(get_gong_service),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, db)
     try:
         integration_id = gong_service.get_crm_integration()
         return {"integration_id": str(integration_id)}
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.api import schemas
+from app.api.bulk import bulk_query_budget, bulk_upsert
+from app.api.pagination import paginate
 from app.db import models
 from app.api.security import get_current_active_user
+from app.api.query_timing import query_budget
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Lead)
+@query_budget(4)
 def create_lead(
     lead: schemas.LeadCreate,
     db: Session = Depends(get_db),
@@ -21,54 +26,79 @@ def create_lead(
     return new_lead
 
 
+@router.post("/bulk", response_model=schemas.BulkResponse)
+@query_budget(bulk_query_budget(models.Lead, "email"))
+def bulk_upsert_leads(
+    leads: list[dict],
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_active_user),
+):
+    # Leads are matched by email; existing ones are updated in place.
+    return bulk_upsert(db, models.Lead, schemas.LeadCreate, leads, "email")
+
+
 @router.get("/", response_model=list[schemas.Lead])
+@query_budget(2)
 def read_leads(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    leads = db.query(models.Lead).offset(skip).limit(limit).all()
+    leads = paginate(
+        db.query(models.Lead), models.Lead.id, response, skip, limit, cursor
+    )
     return leads
 
 
 @router.get("/user/{user_id}", response_model=list[schemas.Lead])
+@query_budget(2)
 def read_leads_by_user(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    leads = (
-        db.query(models.Lead)
-        .filter(models.Lead.owner_id == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    leads = paginate(
+        db.query(models.Lead).filter(models.Lead.owner_id == user_id),
+        models.Lead.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return leads
 
 
 @router.get("/status/{status}", response_model=list[schemas.Lead])
+@query_budget(2)
 def read_leads_by_status(
     status: schemas.LeadStatusEnum,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_user),
 ):
-    leads = (
-        db.query(models.Lead)
-        .filter(models.Lead.status == status)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    leads = paginate(
+        db.query(models.Lead).filter(models.Lead.status == status),
+        models.Lead.id,
+        response,
+        skip,
+        limit,
+        cursor,
     )
     return leads
 
 
 @router.get("/{lead_id}", response_model=schemas.Lead)
+@query_budget(2)
 def read_lead(
     lead_id: int,
     db: Session = Depends(get_db),
@@ -81,6 +111,7 @@ def read_lead(
 
 
 @router.put("/{lead_id}", response_model=schemas.Lead)
+@query_budget(5)
 def update_lead(
     lead_id: int,
     lead: schemas.LeadUpdate,
@@ -103,6 +134,7 @@ def update_lead(
 
 
 @router.delete("/{lead_id}", response_model=schemas.Lead)
+@query_budget(4)
 def delete_lead(
     lead_id: int,
     db: Session = Depends(get_db),
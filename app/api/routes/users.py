@@ -1,18 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.api import schemas
+from app.api.pagination import paginate
 from app.db import models
 from app.api.security import (
     get_password_hash,
     get_current_active_user,
     get_current_active_admin,
 )
+from app.api.query_timing import query_budget
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.User)
+@query_budget(4)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db_user = db.query(models.User).filter(models.User.email == user.email).first()
     if db_user:
@@ -35,6 +39,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/promote/{user_id}", response_model=schemas.User)
+@query_budget(5)
 def promote_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -50,6 +55,7 @@ def promote_user(
 
 
 @router.post("/disable/{user_id}", response_model=schemas.User)
+@query_budget(5)
 def disable_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -65,6 +71,7 @@ def disable_user(
 
 
 @router.post("/enable/{user_id}", response_model=schemas.User)
+@query_budget(5)
 def enable_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -80,22 +87,29 @@ def enable_user(
 
 
 @router.get("/me", response_model=schemas.User)
+@query_budget(1)
 def read_users_me(current_user: schemas.User = Depends(get_current_active_user)):
     return current_user
 
 
 @router.get("/", response_model=list[schemas.User])
+@query_budget(2)
 def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_active_admin),
 ):
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    users = paginate(
+        db.query(models.User), models.User.id, response, skip, limit, cursor
+    )
     return users
 
 
 @router.get("/{user_id}", response_model=schemas.User)
+@query_budget(2)
 def read_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -108,6 +122,7 @@ def read_user(
 
 
 @router.put("/{user_id}", response_model=schemas.User)
+@query_budget(5)
 def update_user(
     user_id: int,
     user: schemas.UserUpdate,
@@ -127,6 +142,7 @@ def update_user(
 
 
 @router.delete("/{user_id}", response_model=schemas.User)
+@query_budget(6)
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -7,6 +7,7 @@ from app.db.models import (
     IndustryEnum,
     LeadStatusEnum,
     RoleEnum,
+    JobStatusEnum,
 )
 
 
@@ -52,7 +53,7 @@ class User(UserBase):
 
 class DomainBase(BaseModel):
     name: str
-    company_id: Optional[int]
+    company_id: Optional[int] = None
 
 
 class DomainCreate(DomainBase):
@@ -78,7 +79,7 @@ class CompanyBase(BaseModel):
 
 
 class CompanyCreate(CompanyBase):
-    pass
+    domains: list[DomainCreate] = []
 
 
 class CompanyUpdate(CompanyBase):
@@ -176,6 +177,20 @@ class Lead(LeadBase):
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
+class BulkRecordResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkRecordResult]
+
+
 class IntegrationResponse(BaseModel):
     integration_id: str
 
@@ -189,8 +204,61 @@ class GongAsyncResponse(BaseModel):
     clientRequestId: str
 
 
+class GongPhaseTiming(BaseModel):
+    calls: int
+    seconds: float
+    rows: int = 0
+    bytes: int = 0
+    statuses: Dict[str, int] = {}
+
+
 class GongUploadMessageResponse(MessageResponse):
-    responses: Dict[str, GongAsyncResponse]
+    responses: Dict[str, List[GongAsyncResponse]]
+    record_stats: Dict[str, Dict[str, int]] = {}
+    phase_timings: Dict[str, Dict[str, GongPhaseTiming]] = {}
+
+
+class GongReconcileReport(BaseModel):
+    buckets: int
+    buckets_compared: int
+    objects_fetched: int
+    missing: List[str]
+    stale: List[str]
+    extra: List[str]
+    repaired: int
+
+
+class GongReconcileResponse(MessageResponse):
+    reports: Dict[str, GongReconcileReport]
+
+
+class GongDumpCheckpoint(BaseModel):
+    object_type: str
+    last_object_id: Optional[int] = None
+    chunks_acknowledged: int = 0
+    rows_acknowledged: int = 0
+    completed: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GongSyncJob(BaseModel):
+    id: int
+    integration_id: str
+    kind: str
+    status: JobStatusEnum
+    phase: Optional[str] = None
+    rows_serialized: int = 0
+    chunks_uploaded: int = 0
+    responses: Optional[Dict[str, List[GongAsyncResponse]]] = None
+    phase_timings: Optional[Dict[str, Dict[str, GongPhaseTiming]]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    checkpoints: List[GongDumpCheckpoint] = []
+
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class SchemaField(BaseModel):
@@ -218,6 +286,31 @@ class GongRequestStatusResponse(BaseModel):
     errors: Optional[List[GongRequestError]] = None
 
 
+class GongRequest(BaseModel):
+    id: int
+    integration_id: str
+    client_request_id: str
+    request_id: Optional[str] = None
+    object_type: str
+    chunk_index: int
+    first_object_id: Optional[str] = None
+    last_object_id: Optional[str] = None
+    record_count: int
+    status: str
+    errors: Optional[List[GongRequestError]] = None
+    poll_attempts: int = 0
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CrmObjectsRequest(BaseModel):
+    object_type: str
+    object_ids: List[str]
+
+
 class CrmObject(BaseModel):
     crmObjects: Dict[str, Any]
 
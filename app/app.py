@@ -1,12 +1,34 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.query_timing import QueryTimingMiddleware
 from app.api.routes import router as api_router
+from app.api.routes.gong import request_poller, outbox_worker
+
+GONG_REQUEST_POLLER_ENABLED = os.getenv("GONG_REQUEST_POLLER_ENABLED", "true") == "true"
+GONG_OUTBOX_WORKER_ENABLED = os.getenv("GONG_OUTBOX_WORKER_ENABLED", "false") == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if GONG_REQUEST_POLLER_ENABLED:
+        request_poller.start()
+    if GONG_OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
+    yield
+    request_poller.stop()
+    outbox_worker.stop()
+
 
 app = FastAPI(
     title="Gong Integration API",
     description="API for integrating Gong with CRM",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -19,7 +41,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(QueryTimingMiddleware)
 
 
 @app.get("/ping")
@@ -6,9 +6,19 @@ from app.db.models import (
     Contact,
     Deal,
     Lead,
+    GongSyncWatermark,
+    GongSyncJob,
+    GongSchemaRegistration,
+    GongRequest,
+    GongOutboxEntry,
+    GongRecordFingerprint,
+    GongDumpCheckpoint,
+    GongDaemonLease,
     StatusEnum,
     StageEnum,
     IndustryEnum,
     LeadStatusEnum,
     RoleEnum,
+    JobStatusEnum,
 )
+from app.db import outbox
@@ -1,12 +1,153 @@
+import logging
 import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.sql.util import _repr_params
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
+# Seconds a SQLite connection waits for another connection's write lock.
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+
+# Statements taking longer than this many milliseconds are logged with their
+# parameters; 0 disables the slow query log.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Also log the query plan of slow statements.
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false") == "true"
+# A statement run this many times while tracking queries is a suspected N+1.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# Slow statements' parameters are logged truncated, as SQLAlchemy's echo does.
+SLOW_QUERY_MAX_PARAMS = 10
+SLOW_QUERY_MAX_PARAM_CHARS = 100
+
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Gong exports stream rows from one connection while upload threads record
+    # their progress through others. In WAL mode SQLite readers do not block
+    # writers, so those writes do not wait for the export to finish.
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000}")
+        cursor.close()
+
+
+class QueryStats:
+    """
+    The statements executed while tracking queries, and the time they took.
+
+    Statements are also recorded in the `parent` stats, if any.
+    """
+
+    def __init__(self, parent=None):
+        self.lock = threading.Lock()
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, seconds, executemany=False):
+        with self.lock:
+            self.count += 1
+            self.seconds += seconds
+            # The batches of one executemany statement are not repeated queries.
+            if not executemany:
+                self.statements[statement] += 1
+        if self.parent is not None:
+            self.parent.record(statement, seconds, executemany)
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Return the statements run at least `threshold` times, with their counts."""
+        with self.lock:
+            return {
+                statement: count
+                for statement, count in self.statements.items()
+                if count >= threshold
+            }
+
+
+_query_stats = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """
+    Record the statements executed in the current context in a new QueryStats.
+
+    The context includes threads started with `asyncio.to_thread`, such as
+    FastAPI's sync endpoints and dependencies, but not other thread pools.
+    Tracking may be nested; enclosing trackers count the statements too.
+    """
+    stats = QueryStats(parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _explain(conn, statement, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(map(str, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context so a failed statement leaves nothing behind.
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds, executemany)
+    if not SLOW_QUERY_MS or seconds * 1000 < SLOW_QUERY_MS:
+        return
+    if executemany:
+        # Only the number of rows, as every row's values would flood the log.
+        logged_parameters = f"{len(parameters)} parameter sets"
+    else:
+        logged_parameters = _repr_params(
+            parameters,
+            batches=1,
+            max_params=SLOW_QUERY_MAX_PARAMS,
+            max_chars=SLOW_QUERY_MAX_PARAM_CHARS,
+        )
+    logger.warning(
+        "Slow query (%.1f ms): %s; parameters: %s",
+        seconds * 1000,
+        statement,
+        logged_parameters,
+    )
+    if SLOW_QUERY_EXPLAIN and not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            logger.warning("Could not explain slow query: %s", e)
+        else:
+            logger.warning("Slow query plan:\n%s", "\n".join(plan))
+
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
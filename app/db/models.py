@@ -6,11 +6,14 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     Text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, column_property, relationship
 from app.db.database import Base
 
 
@@ -80,6 +83,13 @@ class RoleEnum(enum.Enum):
     user = "user"
 
 
+class JobStatusEnum(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 class User(Base):
     """
     Business User: The CRM user, such as a seller or manager.
@@ -92,12 +102,12 @@ class User(Base):
     """
 
     __tablename__ = "users"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, nullable=False, index=True)
     email = Column(String, unique=True, nullable=False, index=True)
-    phone = Column(String, nullable=False, index=True)
-    first_name = Column(String, nullable=False, index=True)
-    last_name = Column(String, nullable=False, index=True)
+    phone = Column(String, nullable=False)
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
     password = Column(String, nullable=False)
     salt = Column(String, nullable=False)
     role = Column(Enum(RoleEnum), default=RoleEnum.user)
@@ -121,9 +131,10 @@ class Company(Base):
     """
 
     __tablename__ = "companies"
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (Index("ix_companies_industry_id", "industry", "id"),)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False, index=True)
-    industry = Column(Enum(IndustryEnum), nullable=False, index=True)
+    industry = Column(Enum(IndustryEnum), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -145,9 +156,13 @@ class Domain(Base):
     """
 
     __tablename__ = "domains"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False, index=True)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    # The previous company is loaded on change, so moving a domain can mark it.
+    company_id = column_property(
+        Column(Integer, ForeignKey("companies.id"), nullable=False, index=True),
+        active_history=True,
+    )
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -157,6 +172,29 @@ class Domain(Base):
     company = relationship("Company", back_populates="domains")
 
 
+@event.listens_for(Session, "before_flush")
+def touch_domain_companies(session, flush_context, instances):
+    """
+    Move the updated_at of companies whose domains are added, changed or removed.
+
+    A company's Gong account includes its domains, so watermark syncs only push
+    a changed domain list when the company itself looks modified.
+    """
+    company_ids = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, Domain):
+            continue
+        company_ids.add(instance.company_id)
+        # A domain moved to another company changes the old one too.
+        company_ids.update(inspect(instance).attrs.company_id.history.deleted)
+    company_ids.discard(None)
+    now = datetime.now(timezone.utc)
+    for company_id in company_ids:
+        company = session.get(Company, company_id)
+        if company is not None:
+            company.updated_at = now
+
+
 class Contact(Base):
     """
     Contact: A specific contact in the CRM that is associated with a customer.
@@ -166,11 +204,12 @@ class Contact(Base):
     """
 
     __tablename__ = "contacts"
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String, nullable=False, index=True)
-    last_name = Column(String, nullable=False, index=True)
+    __table_args__ = (Index("ix_contacts_company_id_id", "company_id", "id"),)
+    id = Column(Integer, primary_key=True)
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False, index=True)
-    phone = Column(String, nullable=False, index=True)
+    phone = Column(String, nullable=False)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
@@ -190,11 +229,17 @@ class Deal(Base):
     """
 
     __tablename__ = "deals"
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, nullable=False, index=True)
-    amount = Column(Integer, nullable=False, index=True)
-    open_date = Column(DateTime, nullable=False, index=True)
-    close_date = Column(DateTime, index=True)
+    __table_args__ = (
+        Index("ix_deals_owner_id_id", "owner_id", "id"),
+        Index("ix_deals_company_id_id", "company_id", "id"),
+        Index("ix_deals_stage_id", "stage", "id"),
+        Index("ix_deals_status_id", "status", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    amount = Column(Integer, nullable=False)
+    open_date = Column(DateTime, nullable=False)
+    close_date = Column(DateTime)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     stage = Column(Enum(StageEnum), default=StageEnum.prospecting)
@@ -221,12 +266,16 @@ class Lead(Base):
     """
 
     __tablename__ = "leads"
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String, nullable=False, index=True)
-    last_name = Column(String, nullable=False, index=True)
-    company = Column(String, nullable=False, index=True)
+    __table_args__ = (
+        Index("ix_leads_owner_id_id", "owner_id", "id"),
+        Index("ix_leads_status_id", "status", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
+    company = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False, index=True)
-    phone = Column(String, nullable=False, index=True)
+    phone = Column(String, nullable=False)
     details = Column(Text)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     converted_to_deal_id = Column(Integer, ForeignKey("deals.id"))
@@ -243,3 +292,184 @@ class Lead(Base):
     converted_to_deal = relationship("Deal", back_populates="leads")
     converted_to_contact = relationship("Contact", back_populates="leads")
     converted_to_company = relationship("Company", back_populates="leads")
+
+
+class GongSyncWatermark(Base):
+    """
+    Gong Sync Watermark: The high-water mark of the last successful Gong upload.
+
+    For each integration and Gong object type, the watermark is the latest
+    `updated_at` value included in a successful upload. Incremental syncs only
+    push rows modified after it.
+    """
+
+    __tablename__ = "gong_sync_watermarks"
+    integration_id = Column(String, primary_key=True)
+    object_type = Column(String, primary_key=True)
+    high_water_mark = Column(DateTime, nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class GongSyncJob(Base):
+    """
+    Gong Sync Job: A full dump or sync to Gong running in the background.
+
+    Tracks the progress of the job as it runs: the object types being pushed,
+    how many rows were serialized and chunks uploaded, the Gong responses and
+    phase timings for each object type and the error that stopped the job, if
+    any.
+    `active_integration_id` holds the integration ID while the job is queued or
+    running and is unique, so only one job per integration runs at a time.
+    """
+
+    __tablename__ = "gong_sync_jobs"
+    id = Column(Integer, primary_key=True)
+    integration_id = Column(String, nullable=False, index=True)
+    active_integration_id = Column(String, unique=True)
+    kind = Column(String, nullable=False)
+    status = Column(Enum(JobStatusEnum), default=JobStatusEnum.queued)
+    phase = Column(String)
+    rows_serialized = Column(Integer, default=0)
+    chunks_uploaded = Column(Integer, default=0)
+    responses = Column(JSON, default=dict)
+    phase_timings = Column(JSON, default=dict)
+    error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    finished_at = Column(DateTime)
+    checkpoints = relationship("GongDumpCheckpoint")
+
+
+class GongSchemaRegistration(Base):
+    """
+    Gong Schema Registration: The custom field schema last registered in Gong.
+
+    Stores a content hash of the schema payloads last registered for each
+    integration so unchanged schemas are not checked or uploaded again.
+    """
+
+    __tablename__ = "gong_schema_registrations"
+    integration_id = Column(String, primary_key=True)
+    schema_hash = Column(String, nullable=False)
+    registered_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class GongRequest(Base):
+    """
+    Gong Request: An upload to Gong and its processing status.
+
+    Gong processes uploaded files asynchronously. Every uploaded chunk is
+    recorded with the object type and object ID range it holds, and its status
+    is polled until Gong reports it as done or failed, along with the errors
+    for any lines Gong rejected.
+    """
+
+    __tablename__ = "gong_requests"
+    __table_args__ = (Index("ix_gong_requests_status_id", "status", "id"),)
+    id = Column(Integer, primary_key=True)
+    integration_id = Column(String, nullable=False)
+    client_request_id = Column(String, unique=True, nullable=False, index=True)
+    request_id = Column(String)
+    object_type = Column(String, nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    first_object_id = Column(String)
+    last_object_id = Column(String)
+    record_count = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="PENDING")
+    errors = Column(JSON)
+    poll_attempts = Column(Integer, default=0)
+    next_poll_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    completed_at = Column(DateTime)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class GongOutboxEntry(Base):
+    """
+    Gong Outbox Entry: A change to a synced entity that has not reached Gong yet.
+
+    Entries are written in the same transaction as the change itself, recording
+    the Gong object type and ID of the entity and whether it was upserted or
+    deleted. The outbox worker drains them to push the latest state of each
+    entity, or a tombstone for deleted ones, to Gong.
+    """
+
+    __tablename__ = "gong_outbox"
+    id = Column(Integer, primary_key=True)
+    object_type = Column(String, nullable=False)
+    object_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class GongRecordFingerprint(Base):
+    """
+    Gong Record Fingerprint: A hash of the record last pushed to Gong for an entity.
+
+    The hash covers every field of the Gong record except `modifiedDate`, so
+    entities whose `updated_at` changed without any change visible in Gong can
+    be skipped by incremental syncs.
+    """
+
+    __tablename__ = "gong_record_fingerprints"
+    integration_id = Column(String, primary_key=True)
+    object_type = Column(String, primary_key=True)
+    object_id = Column(String, primary_key=True)
+    payload_hash = Column(String, nullable=False)
+    pushed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class GongDumpCheckpoint(Base):
+    """
+    Gong Dump Checkpoint: How far a dump job got through an object type.
+
+    `last_object_id` is the highest ID such that it and every row before it
+    were in chunks accepted by Gong, and `high_water_mark` is the updated_at
+    bound the dump exported up to. Resuming a failed job continues each object
+    type after its checkpoint with the same bound and skips completed ones.
+    """
+
+    __tablename__ = "gong_dump_checkpoints"
+    job_id = Column(Integer, ForeignKey("gong_sync_jobs.id"), primary_key=True)
+    object_type = Column(String, primary_key=True)
+    high_water_mark = Column(DateTime)
+    last_object_id = Column(Integer)
+    chunks_acknowledged = Column(Integer, default=0)
+    rows_acknowledged = Column(Integer, default=0)
+    completed = Column(Boolean, default=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class GongDaemonLease(Base):
+    """
+    Gong Daemon Lease: The sync daemon allowed to run for an integration.
+
+    A daemon holds the lease while `expires_at` is in the future and renews it
+    every round; another daemon may take it over once it expires.
+    """
+
+    __tablename__ = "gong_daemon_leases"
+    integration_id = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timezone
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.db.models import User, Company, Domain, Contact, Deal, Lead, GongOutboxEntry
+
+# Gong object type of each synced model.
+OUTBOX_OBJECT_TYPES = {
+    User: "BUSINESS_USER",
+    Company: "ACCOUNT",
+    Contact: "CONTACT",
+    Deal: "DEAL",
+    Lead: "LEAD",
+}
+
+# Entries are only recorded when something drains them: the background worker,
+# or `scripts/gong_utils.py drain_outbox` run on a schedule with this set.
+OUTBOX_ENABLED = (
+    os.getenv("GONG_OUTBOX_ENABLED", os.getenv("GONG_OUTBOX_WORKER_ENABLED", "false"))
+    == "true"
+)
+
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+def _outbox_entry(instance, op):
+    if isinstance(instance, Domain):
+        # Domains are sent to Gong as part of their account.
+        if instance.company_id is None:
+            return None
+        return ("ACCOUNT", instance.company_id, OP_UPSERT)
+    object_type = OUTBOX_OBJECT_TYPES.get(type(instance))
+    if object_type is None or instance.id is None:
+        return None
+    return (object_type, instance.id, op)
+
+
+@event.listens_for(Session, "after_flush")
+def record_outbox_entries(session, flush_context):
+    """
+    Write an outbox entry for every synced entity changed by a flush.
+
+    The entries are inserted on the flush's connection, so they commit or roll
+    back together with the change they describe. Nothing is recorded unless
+    the outbox is enabled.
+    """
+    if not OUTBOX_ENABLED:
+        return
+    entries = set()
+    for instance in session.new:
+        entries.add(_outbox_entry(instance, OP_UPSERT))
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            entries.add(_outbox_entry(instance, OP_UPSERT))
+    for instance in session.deleted:
+        entries.add(_outbox_entry(instance, OP_DELETE))
+    entries.discard(None)
+    _insert_entries(session, entries)
+
+
+def record_upserts(session, model, object_ids):
+    """
+    Write upsert outbox entries for rows of `model` written by Core statements.
+
+    Bulk inserts and updates bypass the unit of work, so no flush records them.
+    """
+    object_type = OUTBOX_OBJECT_TYPES[model]
+    _insert_entries(
+        session, {(object_type, object_id, OP_UPSERT) for object_id in object_ids}
+    )
+
+
+def _insert_entries(session, entries):
+    if not OUTBOX_ENABLED or not entries:
+        return
+    now = datetime.now(timezone.utc)
+    session.connection().execute(
+        insert(GongOutboxEntry),
+        [
+            {
+                "object_type": object_type,
+                "object_id": object_id,
+                "op": op,
+                "created_at": now,
+            }
+            for object_type, object_id, op in sorted(entries)
+        ],
+    )
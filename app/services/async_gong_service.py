@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from collections import Counter
+from app.services.gong_service import GongService
+from app.services.sync_metrics import PhaseTimer
+
+# Object types that must be in Gong before each object type is pushed. Contacts,
+# deals and leads reference accounts and business users, and deals reference
+# stages; everything else can be uploaded at the same time.
+PUSH_DEPENDENCIES = {
+    "STAGE": (),
+    "BUSINESS_USER": (),
+    "ACCOUNT": (),
+    "CONTACT": ("BUSINESS_USER", "ACCOUNT"),
+    "DEAL": ("STAGE", "BUSINESS_USER", "ACCOUNT"),
+    "LEAD": ("BUSINESS_USER", "ACCOUNT"),
+}
+
+
+class AsyncGongService:
+    """
+    Asyncio front end to GongService that pushes object types as a DAG.
+
+    Each object type is pushed as soon as the object types it depends on are
+    in Gong, so independent types upload at the same time. Database and HTTP
+    work runs in worker threads, each push with its own session from
+    `session_factory` because SQLAlchemy sessions are not thread-safe.
+    """
+
+    def __init__(self, session_factory, api_url, credentials, base_url, **options):
+        self.session_factory = session_factory
+        self.api_url = api_url
+        self.credentials = credentials
+        self.base_url = base_url
+        self.options = options
+        # record_stats of every GongService call, merged by object type.
+        self.record_stats = {}
+        # Phase timings of every GongService call, merged by object type.
+        self.phase_timers = {}
+        self._record_stats_lock = threading.Lock()
+
+    def _call(self, method, *args, **kwargs):
+        session = self.session_factory()
+        try:
+            gong_service = GongService(
+                self.api_url, self.credentials, self.base_url, session, **self.options
+            )
+            try:
+                return getattr(gong_service, method)(*args, **kwargs)
+            finally:
+                with self._record_stats_lock:
+                    for object_type, stats in gong_service.record_stats.items():
+                        self.record_stats.setdefault(object_type, Counter()).update(
+                            stats
+                        )
+                    for object_type, timer in gong_service.phase_timers.items():
+                        # Already counted in the process-wide metrics.
+                        self.phase_timers.setdefault(
+                            object_type, PhaseTimer(object_type, metrics=None)
+                        ).merge(timer.as_dict())
+        finally:
+            session.close()
+
+    async def call(self, method, *args, **kwargs):
+        """Run a GongService method in a worker thread with its own session."""
+        return await asyncio.to_thread(self._call, method, *args, **kwargs)
+
+    @property
+    def phase_timings(self):
+        """Return the merged phase timings as plain dicts, by object type."""
+        return {
+            object_type: timer.as_dict()
+            for object_type, timer in self.phase_timers.items()
+        }
+
+    async def get_crm_integration(self):
+        return await self.call("get_crm_integration")
+
+    async def _push_all(
+        self, integration_id, object_types, since, until, dedupe=False, job_id=None
+    ):
+        tasks = {}
+
+        async def push(object_type):
+            dependencies = [
+                tasks[dependency]
+                for dependency in PUSH_DEPENDENCIES[object_type]
+                if dependency in tasks
+            ]
+            await asyncio.gather(*dependencies)
+            return await self.call(
+                "push_object_type",
+                integration_id,
+                object_type,
+                since,
+                until,
+                dedupe=dedupe,
+                job_id=job_id,
+            )
+
+        # PUSH_DEPENDENCIES is in topological order, so dependencies are
+        # scheduled before the object types waiting on them.
+        for object_type in PUSH_DEPENDENCIES:
+            if object_type in object_types:
+                tasks[object_type] = asyncio.ensure_future(push(object_type))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return dict(zip(tasks, results))
+
+    async def full_db_dump(self, integration_id, job_id=None):
+        # With `job_id`, each object type is checkpointed under that job and a
+        # job that was stopped continues from its checkpoints.
+        object_types, since, until = await self.call("sync_plan", integration_id)
+        return await self._push_all(
+            integration_id, object_types, since, until, job_id=job_id
+        )
+
+    async def incremental_sync(self, integration_id, job_id=None):
+        object_types, since, until = await self.call(
+            "sync_plan", integration_id, incremental=True
+        )
+        return await self._push_all(
+            integration_id, object_types, since, until, dedupe=True, job_id=job_id
+        )
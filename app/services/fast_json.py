@@ -0,0 +1,26 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj):
+    """
+    Serialize `obj` to compact UTF-8 JSON bytes.
+
+    Uses orjson when it is installed, which is several times faster than the
+    standard library for the flat records uploaded to Gong, and falls back to
+    an equivalent `json.dumps` otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    """Parse JSON from bytes or str, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,139 @@
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app.db.models import GongDaemonLease, GongSyncJob, JobStatusEnum
+from app.services.gong_jobs import GongJobConflict
+from app.services.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL = float(os.getenv("GONG_SYNC_INTERVAL", "300"))
+# Up to this many seconds are added at random to each interval, so daemons
+# started together do not poll the database and Gong in lockstep.
+SYNC_JITTER = float(os.getenv("GONG_SYNC_JITTER", "30"))
+# How long a daemon's lease lasts without being renewed. It is renewed before
+# and after every sync; a sync outlasting it is still protected by the job lock.
+SYNC_LEASE = timedelta(seconds=int(os.getenv("GONG_SYNC_LEASE_SECONDS", "900")))
+
+
+class GongSyncDaemon(PeriodicWorker):
+    """
+    Runs incremental syncs of one integration as jobs, every `interval` seconds.
+
+    Only the daemon holding the integration's lease in gong_daemon_leases
+    syncs; others keep waiting and take over if its lease expires. Each sync
+    is a job of `job_runner`, so it never overlaps a dump or sync started
+    elsewhere.
+    """
+
+    name = "gong-sync-daemon"
+
+    def __init__(
+        self,
+        session_factory,
+        job_runner,
+        integration_id,
+        interval=SYNC_INTERVAL,
+        jitter=SYNC_JITTER,
+        lease=SYNC_LEASE,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.job_runner = job_runner
+        self.integration_id = str(integration_id)
+        self.jitter = jitter
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def next_interval(self):
+        return self.interval + random.uniform(0, self.jitter)
+
+    def acquire_lease(self):
+        """Take or renew the integration's lease and return whether it is held."""
+        now = datetime.now(timezone.utc)
+        session = self.session_factory()
+        try:
+            renewed = (
+                session.query(GongDaemonLease)
+                .filter(
+                    GongDaemonLease.integration_id == self.integration_id,
+                    or_(
+                        GongDaemonLease.owner == self.owner,
+                        GongDaemonLease.expires_at < now,
+                    ),
+                )
+                .update(
+                    {
+                        GongDaemonLease.owner: self.owner,
+                        GongDaemonLease.expires_at: now + self.lease,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not renewed:
+                session.add(
+                    GongDaemonLease(
+                        integration_id=self.integration_id,
+                        owner=self.owner,
+                        expires_at=now + self.lease,
+                    )
+                )
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return False
+            return True
+        finally:
+            session.close()
+
+    def release_lease(self):
+        session = self.session_factory()
+        try:
+            session.query(GongDaemonLease).filter(
+                GongDaemonLease.integration_id == self.integration_id,
+                GongDaemonLease.owner == self.owner,
+            ).delete(synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def run_once(self):
+        """Run one incremental sync if this daemon holds the lease; return its job."""
+        if not self.acquire_lease():
+            logger.info(
+                "Another daemon holds the sync lease of integration %s",
+                self.integration_id,
+            )
+            return None
+        try:
+            job_id = self.job_runner.run(self.integration_id, "incremental_sync")
+        except GongJobConflict as e:
+            logger.info("Skipping incremental sync: %s", e)
+            return None
+        finally:
+            self.acquire_lease()
+
+        session = self.session_factory()
+        try:
+            job = session.get(GongSyncJob, job_id)
+            if job.status == JobStatusEnum.succeeded:
+                logger.info(
+                    "Incremental sync job %d pushed %d rows",
+                    job_id,
+                    job.rows_serialized,
+                )
+            else:
+                logger.error("Incremental sync job %d failed: %s", job_id, job.error)
+        finally:
+            session.close()
+        return job_id
+
+    def stop(self):
+        super().stop()
+        self.release_lease()
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from app.db.models import GongSyncJob, JobStatusEnum
+
+# Number of jobs that run at the same time in a process.
+JOB_WORKERS = int(os.getenv("GONG_JOB_WORKERS", "2"))
+
+# A queued or running job that has not reported progress for this long is
+# assumed to have died with its process and no longer blocks new jobs.
+JOB_STALE_AFTER = timedelta(seconds=int(os.getenv("GONG_JOB_STALE_SECONDS", "900")))
+
+
+class GongJobConflict(Exception):
+    pass
+
+
+class GongJobNotFound(Exception):
+    pass
+
+
+class JobProgress:
+    """
+    GongService progress callback that persists a job's state as it runs.
+
+    Events may arrive from several upload threads at once, so updates are
+    serialized with a lock and each one is written with a short-lived session.
+    """
+
+    def __init__(self, session_factory, job_id):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.lock = threading.Lock()
+        self.active = []
+        # A resumed job carries on from the totals of its earlier runs.
+        session = self.session_factory()
+        try:
+            job = session.get(GongSyncJob, job_id)
+            self.rows_serialized = job.rows_serialized or 0
+            self.chunks_uploaded = job.chunks_uploaded or 0
+            self.previous_responses = dict(job.responses or {})
+            self.phase_timings = dict(job.phase_timings or {})
+        finally:
+            session.close()
+        self.responses = {k: list(v) for k, v in self.previous_responses.items()}
+
+    def __call__(self, event, object_type, **details):
+        with self.lock:
+            if event == "push_started":
+                self.active.append(object_type)
+                self.responses.setdefault(object_type, [])
+            elif event == "push_finished":
+                self.active.remove(object_type)
+                # A resumed object type reports the timings of its last run.
+                self.phase_timings[object_type] = details.get("phases", {})
+            elif event == "chunk_uploaded":
+                self.rows_serialized += details["rows"]
+                self.chunks_uploaded += 1
+                self.responses.setdefault(object_type, []).append(details["response"])
+            phase = f"pushing {', '.join(self.active)}" if self.active else "running"
+            self.save(phase=phase)
+
+    def save(self, **values):
+        session = self.session_factory()
+        try:
+            job = session.get(GongSyncJob, self.job_id)
+            job.rows_serialized = self.rows_serialized
+            job.chunks_uploaded = self.chunks_uploaded
+            job.responses = {k: list(v) for k, v in self.responses.items()}
+            job.phase_timings = dict(self.phase_timings)
+            for key, value in values.items():
+                setattr(job, key, value)
+            session.commit()
+        finally:
+            session.close()
+
+    def finish(self, status, responses=None, error=None):
+        with self.lock:
+            if responses is not None:
+                self.responses = dict(self.previous_responses)
+                for object_type, object_responses in responses.items():
+                    self.responses[object_type] = self.previous_responses.get(
+                        object_type, []
+                    ) + list(object_responses)
+            self.save(
+                status=status,
+                phase=status.value,
+                error=error,
+                active_integration_id=None,
+                finished_at=datetime.now(timezone.utc),
+            )
+
+
+class GongJobRunner:
+    """
+    Runs Gong dumps and syncs as jobs on a background thread pool.
+
+    `service_factory(progress, **options)` must return an AsyncGongService
+    reporting to `progress`, with the options a job was submitted with. Jobs
+    are recorded in the gong_sync_jobs table, which also acts as the lock
+    allowing a single queued or running job per integration. Each job is
+    checkpointed under its ID, so a failed job can be resumed.
+    """
+
+    def __init__(self, session_factory, service_factory, max_workers=JOB_WORKERS):
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gong-job"
+        )
+
+    def _release_stale_lock(self, session, integration_id):
+        stale_before = datetime.now(timezone.utc) - JOB_STALE_AFTER
+        session.query(GongSyncJob).filter(
+            GongSyncJob.active_integration_id == integration_id,
+            GongSyncJob.updated_at < stale_before,
+        ).update(
+            {
+                GongSyncJob.active_integration_id: None,
+                GongSyncJob.status: JobStatusEnum.failed,
+                GongSyncJob.error: "Job stopped reporting progress",
+                GongSyncJob.finished_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+        session.commit()
+
+    def _conflict(self, session, integration_id):
+        session.rollback()
+        active_job = (
+            session.query(GongSyncJob)
+            .filter(GongSyncJob.active_integration_id == integration_id)
+            .first()
+        )
+        active_job_id = active_job.id if active_job else None
+        return GongJobConflict(
+            f"Job {active_job_id} is already in progress for integration {integration_id}"
+        )
+
+    def _create_job(self, integration_id, kind, resume_job_id=None):
+        integration_id = str(integration_id)
+        session = self.session_factory()
+        try:
+            self._release_stale_lock(session, integration_id)
+            if resume_job_id is None:
+                job = GongSyncJob(
+                    integration_id=integration_id,
+                    active_integration_id=integration_id,
+                    kind=kind,
+                    status=JobStatusEnum.queued,
+                    phase="queued",
+                    responses={},
+                )
+                session.add(job)
+            else:
+                job = session.get(GongSyncJob, resume_job_id)
+                if job is None or job.integration_id != integration_id:
+                    raise GongJobNotFound(f"Job {resume_job_id} not found")
+                if job.status != JobStatusEnum.failed:
+                    raise GongJobConflict(
+                        f"Job {resume_job_id} is {job.status.value} and cannot be resumed"
+                    )
+                job.active_integration_id = integration_id
+                job.status = JobStatusEnum.queued
+                job.phase = "queued"
+                job.error = None
+                job.finished_at = None
+            try:
+                session.commit()
+            except IntegrityError:
+                raise self._conflict(session, integration_id)
+            return job.id, job.kind
+        finally:
+            session.close()
+
+    def submit(
+        self, integration_id, kind="full_db_dump", resume_job_id=None, **options
+    ):
+        """
+        Record a queued job, start it in the background and return its ID.
+
+        With `resume_job_id`, that failed job is run again instead, continuing
+        from the checkpoints of its earlier runs.
+        """
+        job_id, kind = self._create_job(integration_id, kind, resume_job_id)
+        self.executor.submit(self._run, job_id, str(integration_id), kind, options)
+        return job_id
+
+    def run(self, integration_id, kind="full_db_dump", resume_job_id=None, **options):
+        """Record a job like `submit`, run it on the calling thread and return its ID."""
+        job_id, kind = self._create_job(integration_id, kind, resume_job_id)
+        self._run(job_id, str(integration_id), kind, options)
+        return job_id
+
+    def _run(self, job_id, integration_id, kind, options):
+        progress = JobProgress(self.session_factory, job_id)
+        try:
+            progress.save(status=JobStatusEnum.running, phase="running")
+            gong_service = self.service_factory(progress, **options)
+            responses = asyncio.run(
+                getattr(gong_service, kind)(integration_id, job_id=job_id)
+            )
+            progress.finish(JobStatusEnum.succeeded, responses=responses)
+        except BaseException as e:
+            # Interrupted jobs are failed too, so they can be resumed at once.
+            progress.finish(JobStatusEnum.failed, error=str(e) or type(e).__name__)
+            if not isinstance(e, Exception):
+                raise
@@ -0,0 +1,130 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from app.db.models import GongRequest
+from app.services.gong_service import GongException
+from app.services.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+# Gong request statuses after which a request is no longer polled.
+TERMINAL_STATUSES = ("DONE", "FAILED")
+
+POLL_INTERVAL = float(os.getenv("GONG_POLL_INTERVAL", "5"))
+POLL_BACKOFF_BASE = float(os.getenv("GONG_POLL_BACKOFF_BASE", "5"))
+POLL_BACKOFF_MAX = float(os.getenv("GONG_POLL_BACKOFF_MAX", "600"))
+POLL_CONCURRENCY = int(os.getenv("GONG_POLL_CONCURRENCY", "8"))
+POLL_BATCH_SIZE = int(os.getenv("GONG_POLL_BATCH_SIZE", "200"))
+# Seconds a claimed request is hidden from other pollers while it is checked.
+POLL_CLAIM_SECONDS = float(os.getenv("GONG_POLL_CLAIM_SECONDS", "300"))
+
+
+def next_poll_delay(poll_attempts):
+    """Seconds to wait before polling a request again, doubling per attempt."""
+    return min(POLL_BACKOFF_MAX, POLL_BACKOFF_BASE * 2 ** min(poll_attempts, 16))
+
+
+class GongRequestPoller(PeriodicWorker):
+    """
+    Polls Gong for the status of every pending request in the ledger.
+
+    Each round checks up to POLL_BATCH_SIZE requests that are due, at most
+    POLL_CONCURRENCY at a time. Requests still processing are polled again
+    with exponential backoff, so a large backlog of slow uploads does not turn
+    into a steady stream of status calls. Requests are claimed before they are
+    polled, so several application workers can run pollers side by side.
+    `service_factory(session)` must return a GongService.
+    """
+
+    name = "gong-request-poller"
+
+    def __init__(self, session_factory, service_factory, interval=POLL_INTERVAL):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+
+    def _check(self, gong_service, request):
+        try:
+            return gong_service.check_request_status(
+                request.integration_id, request.client_request_id
+            )
+        except GongException as e:
+            logger.warning(
+                "Failed to poll Gong request %s: %s", request.client_request_id, e
+            )
+            return None
+
+    def poll_once(self):
+        """Poll every due request once and return how many were checked."""
+        session = self.session_factory()
+        try:
+            now = datetime.now(timezone.utc)
+            due = session.scalars(
+                select(GongRequest.id)
+                .where(
+                    GongRequest.status.notin_(TERMINAL_STATUSES),
+                    GongRequest.next_poll_at <= now,
+                )
+                .order_by(GongRequest.next_poll_at)
+                .limit(POLL_BATCH_SIZE)
+            ).all()
+            if not due:
+                return 0
+            # Claim the due requests by moving their next poll past this round.
+            # Only requests still due are updated, so a request another poller
+            # claimed in the meantime is left to it.
+            claimed = session.scalars(
+                update(GongRequest)
+                .where(GongRequest.id.in_(due), GongRequest.next_poll_at <= now)
+                .values(next_poll_at=now + timedelta(seconds=POLL_CLAIM_SECONDS))
+                .returning(GongRequest.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+            if not claimed:
+                return 0
+            requests = (
+                session.query(GongRequest)
+                .filter(GongRequest.id.in_(claimed))
+                .order_by(GongRequest.id)
+                .all()
+            )
+
+            gong_service = self.service_factory(session)
+            with ThreadPoolExecutor(max_workers=POLL_CONCURRENCY) as executor:
+                results = list(
+                    executor.map(lambda r: self._check(gong_service, r), requests)
+                )
+
+            now = datetime.now(timezone.utc)
+            for request, result in zip(requests, results):
+                request.poll_attempts = (request.poll_attempts or 0) + 1
+                if result is not None:
+                    request.status, errors = result
+                    if errors:
+                        request.errors = errors
+                if request.status == "FAILED" and request.first_object_id:
+                    # Fingerprints are saved once Gong accepts an upload, so
+                    # the rejected records would otherwise be skipped as
+                    # unchanged by every later sync.
+                    gong_service.forget_fingerprint_range(
+                        request.integration_id,
+                        request.object_type,
+                        request.first_object_id,
+                        request.last_object_id,
+                    )
+                if request.status in TERMINAL_STATUSES:
+                    request.completed_at = now
+                else:
+                    request.next_poll_at = now + timedelta(
+                        seconds=next_poll_delay(request.poll_attempts)
+                    )
+            session.commit()
+            return len(requests)
+        finally:
+            session.close()
+
+    def run_once(self):
+        return self.poll_once()
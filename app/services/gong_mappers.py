@@ -0,0 +1,210 @@
+from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter
+from sqlalchemy import func, select
+from app.db.models import User, Company, Domain, Contact, Deal, Lead
+
+
+def isoformat_without_ms(dt):
+    isoformat = dt.replace(microsecond=0).isoformat()
+    return f"{isoformat}Z" if not dt.tzinfo else isoformat
+
+
+def optional_isoformat(dt):
+    return isoformat_without_ms(dt) if dt else None
+
+
+def modified_at(model):
+    """
+    When a row was last modified, as sent to Gong and compared with watermarks.
+
+    Rows never stamped with updated_at fall back to their created_at.
+    """
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def enum_name(value):
+    return value.name
+
+
+def enum_name_upper(value):
+    return value.name.upper()
+
+
+# Separator of values aggregated from related rows. Domain names cannot
+# contain it.
+LIST_SEPARATOR = ","
+
+
+def split_list(value):
+    # Aggregated values come back in no particular order; sorting keeps records
+    # and their fingerprints stable.
+    return sorted(value.split(LIST_SEPARATOR)) if value else []
+
+
+# A Gong field read from the `source` column of a row, optionally passed
+# through `convert`.
+GongField = namedtuple("GongField", ["name", "source", "convert"], defaults=[None])
+
+# A column of a related table aggregated into one value per parent row, joined
+# on `foreign_key` referencing the parent's id.
+RelatedList = namedtuple("RelatedList", ["column", "foreign_key"])
+
+
+class GongMapper:
+    """
+    Declarative mapping of a model to a Gong object type.
+
+    Every record gets objectId, modifiedDate, isDeleted and a url under
+    `url_path` from the row's id and modified_at; `fields` add the rest, in
+    order. A field's source is a column of the model or a name in `related`,
+    whose values are aggregated from another table in the same query.
+    """
+
+    def __init__(self, object_type, model, url_path, fields, related=None):
+        self.object_type = object_type
+        self.model = model
+        self.url_path = url_path
+        self.fields = tuple(fields)
+        self.related = dict(related or {})
+
+    def select(self):
+        """
+        Return a Core select of just the columns the Gong record is built from.
+
+        Rows are plain tuples, so exports do not build ORM objects, and each
+        related list is aggregated by a grouped subquery joined to the model
+        rather than loaded per row.
+        """
+        model = self.model
+        columns = {"id": model.id, "updated_at": modified_at(model)}
+        joins = []
+        for name, related in self.related.items():
+            aggregated = (
+                select(
+                    related.foreign_key.label("parent_id"),
+                    func.aggregate_strings(related.column, LIST_SEPARATOR).label(name),
+                )
+                .group_by(related.foreign_key)
+                .subquery()
+            )
+            columns[name] = aggregated.c[name]
+            joins.append((aggregated, aggregated.c.parent_id == model.id))
+        for field in self.fields:
+            if field.source not in columns:
+                columns[field.source] = getattr(model, field.source)
+
+        statement = select(
+            *(column.label(name) for name, column in columns.items())
+        ).select_from(model)
+        for aggregated, on_clause in joins:
+            statement = statement.outerjoin(aggregated, on_clause)
+        return statement
+
+    def compile(self, base_url):
+        """Return a function turning a row into its Gong record."""
+        get_values = attrgetter("id", "updated_at", *(f.source for f in self.fields))
+        fields = tuple((f.name, f.convert) for f in self.fields)
+        url_prefix = f"{base_url}/{self.url_path}/"
+
+        def serialize(row):
+            object_id, updated_at, *values = get_values(row)
+            object_id = str(object_id)
+            record = {
+                "objectId": object_id,
+                "modifiedDate": optional_isoformat(updated_at),
+                "isDeleted": False,
+                "url": url_prefix + object_id,
+            }
+            for (name, convert), value in zip(fields, values):
+                record[name] = value if convert is None else convert(value)
+            return record
+
+        return serialize
+
+
+# Mappers by Gong object type, in the order object types are pushed.
+GONG_MAPPERS = {}
+
+
+def register_mapper(mapper):
+    GONG_MAPPERS[mapper.object_type] = mapper
+    compile_serializer.cache_clear()
+    return mapper
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(object_type, base_url):
+    return GONG_MAPPERS[object_type].compile(base_url)
+
+
+register_mapper(
+    GongMapper(
+        "BUSINESS_USER",
+        User,
+        "users",
+        [GongField("emailAddress", "email")],
+    )
+)
+register_mapper(
+    GongMapper(
+        "ACCOUNT",
+        Company,
+        "companies",
+        [
+            GongField("name", "name"),
+            GongField("domains", "domains", split_list),
+            GongField("industry", "industry", enum_name),
+        ],
+        related={"domains": RelatedList(Domain.name, Domain.company_id)},
+    )
+)
+register_mapper(
+    GongMapper(
+        "CONTACT",
+        Contact,
+        "contacts",
+        [
+            GongField("accountId", "company_id", str),
+            GongField("emailAddress", "email"),
+            GongField("firstName", "first_name"),
+            GongField("lastName", "last_name"),
+            GongField("phoneNumber", "phone"),
+        ],
+    )
+)
+register_mapper(
+    GongMapper(
+        "DEAL",
+        Deal,
+        "deals",
+        [
+            GongField("accountId", "company_id", str),
+            GongField("ownerId", "owner_id", str),
+            GongField("name", "title"),
+            GongField("createdDate", "open_date", isoformat_without_ms),
+            GongField("closeDate", "close_date", optional_isoformat),
+            GongField("status", "status", enum_name_upper),
+            GongField("stage", "stage", enum_name),
+            GongField("amount", "amount"),
+            GongField("description", "description"),
+        ],
+    )
+)
+register_mapper(
+    GongMapper(
+        "LEAD",
+        Lead,
+        "leads",
+        [
+            GongField("emailAddress", "email"),
+            GongField("firstName", "first_name"),
+            GongField("lastName", "last_name"),
+            GongField("phoneNumber", "phone"),
+            GongField("ownerId", "owner_id", str),
+            GongField("status", "status", enum_name),
+            GongField("account", "company"),
+            GongField("details", "details"),
+        ],
+    )
+)
@@ -0,0 +1,99 @@
+import logging
+import os
+from collections import defaultdict
+from app.db.models import GongOutboxEntry
+from app.db.outbox import OP_DELETE
+from app.services.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_INTERVAL = float(os.getenv("GONG_OUTBOX_INTERVAL", "10"))
+OUTBOX_BATCH_SIZE = int(os.getenv("GONG_OUTBOX_BATCH_SIZE", "5000"))
+
+
+def coalesce_outbox_entries(entries):
+    """
+    Reduce outbox entries to the latest operation per entity.
+
+    Returns `(upserts, deletes)`, each mapping object types to sets of IDs.
+    Entries must be in the order they were written.
+    """
+    latest = {}
+    for entry in entries:
+        latest[(entry.object_type, entry.object_id)] = entry.op
+    upserts = defaultdict(set)
+    deletes = defaultdict(set)
+    for (object_type, object_id), op in latest.items():
+        (deletes if op == OP_DELETE else upserts)[object_type].add(object_id)
+    return upserts, deletes
+
+
+class GongOutboxWorker(PeriodicWorker):
+    """
+    Drains the Gong outbox, pushing recent entity changes to Gong.
+
+    Each round takes up to `batch_size` entries, coalesces repeated changes to
+    the same entity and pushes the resulting upserts and tombstones. Entries
+    are removed only once the push succeeds, so a failed round is retried.
+    `service_factory(session)` must return a GongService.
+    """
+
+    name = "gong-outbox-worker"
+
+    def __init__(
+        self,
+        session_factory,
+        service_factory,
+        interval=OUTBOX_INTERVAL,
+        batch_size=OUTBOX_BATCH_SIZE,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+        self.batch_size = batch_size
+
+    def drain_once(self):
+        """Push one batch of outbox entries and return how many were drained."""
+        session = self.session_factory()
+        try:
+            entries = (
+                session.query(GongOutboxEntry)
+                .order_by(GongOutboxEntry.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not entries:
+                return 0
+
+            upserts, deletes = coalesce_outbox_entries(entries)
+            gong_service = self.service_factory(session)
+            integration_id = gong_service.get_crm_integration()
+            gong_service.push_changes(integration_id, upserts, deletes)
+            for object_type, stats in gong_service.record_stats.items():
+                logger.info(
+                    "Outbox %s records: %d new, %d changed, %d skipped",
+                    object_type,
+                    stats["new"],
+                    stats["changed"],
+                    stats["skipped"],
+                )
+
+            session.query(GongOutboxEntry).filter(
+                GongOutboxEntry.id.in_([entry.id for entry in entries])
+            ).delete(synchronize_session=False)
+            session.commit()
+            return len(entries)
+        finally:
+            session.close()
+
+    def drain(self):
+        """Drain the outbox until it is empty and return the number of entries."""
+        drained = 0
+        while True:
+            count = self.drain_once()
+            drained += count
+            if count < self.batch_size:
+                return drained
+
+    def run_once(self):
+        return self.drain()
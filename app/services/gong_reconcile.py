@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import os
+from collections import defaultdict
+from sqlalchemy import select
+from app.db.models import GongRecordFingerprint
+from app.services.gong_mappers import compile_serializer
+from app.services.gong_service import (
+    GongException,
+    SYNC_MODELS,
+    EXPORT_BATCH_SIZE,
+    record_fingerprint,
+    tombstones,
+)
+
+logger = logging.getLogger(__name__)
+
+# Consecutive primary keys hashed together. Smaller buckets fetch fewer
+# objects from Gong per difference found, at the cost of more hashes.
+RECONCILE_BUCKET_SIZE = int(os.getenv("GONG_RECONCILE_BUCKET_SIZE", "1000"))
+# objectIds looked up in Gong per request.
+RECONCILE_FETCH_BATCH_SIZE = int(os.getenv("GONG_RECONCILE_FETCH_BATCH_SIZE", "100"))
+
+
+def fingerprint_digest(object_id, fingerprint):
+    digest = hashlib.blake2b(f"{object_id}:{fingerprint}".encode(), digest_size=16)
+    return int.from_bytes(digest.digest(), "big")
+
+
+def bucket_hashes(fingerprints, bucket_size):
+    """
+    Hash `(object_id, fingerprint)` pairs by primary-key bucket.
+
+    Digests are XORed together, so pairs may come in any order and equal sets
+    of pairs give equal bucket hashes.
+    """
+    buckets = defaultdict(int)
+    for object_id, fingerprint in fingerprints:
+        buckets[int(object_id) // bucket_size] ^= fingerprint_digest(
+            object_id, fingerprint
+        )
+    return dict(buckets)
+
+
+def gong_object_record(found, object_id):
+    """Return the record held by a crmObjectsMap entry, or None."""
+    if not found:
+        return None
+    record = found.get("crmObjects", {}).get(object_id)
+    return record.get("crmObjects") if record else None
+
+
+class GongReconciler:
+    """
+    Finds and repairs differences between the CRM and the objects held by Gong.
+
+    The fingerprint ledger records what was last pushed to Gong. Current
+    records and the ledger are both hashed by primary-key bucket, and only the
+    objects of buckets whose hashes differ are fetched from Gong and compared
+    record by record, so a verify downloads a small part of what a full dump
+    uploads. `full` compares every bucket, for when Gong may have changed
+    without the ledger knowing. Gong cannot list objects, so extra objects are
+    only found among IDs the CRM or the ledger know of.
+    """
+
+    def __init__(
+        self,
+        gong_service,
+        bucket_size=RECONCILE_BUCKET_SIZE,
+        fetch_batch_size=RECONCILE_FETCH_BATCH_SIZE,
+    ):
+        self.gong_service = gong_service
+        self.session = gong_service.session
+        self.bucket_size = bucket_size
+        self.fetch_batch_size = fetch_batch_size
+
+    def _local_records(self, object_type, id_range=None):
+        serialize = compile_serializer(object_type, self.gong_service.base_url)
+        with self.gong_service._export_query(object_type, id_range=id_range) as rows:
+            for row in rows:
+                yield serialize(row)
+
+    def _ledger(self, integration_id, object_type):
+        statement = select(
+            GongRecordFingerprint.object_id, GongRecordFingerprint.payload_hash
+        ).where(
+            GongRecordFingerprint.integration_id == str(integration_id),
+            GongRecordFingerprint.object_type == object_type,
+        )
+        with self.session.execute(
+            statement,
+            execution_options={"yield_per": EXPORT_BATCH_SIZE},
+        ) as result:
+            yield from result
+
+    def _bucket_range(self, bucket):
+        # Export ID ranges are (exclusive low, inclusive high).
+        return (bucket * self.bucket_size - 1, (bucket + 1) * self.bucket_size - 1)
+
+    def fetch_gong_records(self, integration_id, object_type, object_ids):
+        """Return the objects Gong holds among `object_ids`, by objectId."""
+        records = {}
+        response = self.gong_service.get_crm_objects(
+            integration_id, object_type, object_ids, batch_size=self.fetch_batch_size
+        )
+        for object_id, found in response["crmObjectsMap"].items():
+            record = gong_object_record(found, object_id)
+            if record is not None and not record.get("isDeleted"):
+                records[object_id] = record
+        return records
+
+    def differing_buckets(self, integration_id, object_type, full=False):
+        """Return the buckets whose records differ from the ledger, and the count."""
+        local = bucket_hashes(
+            (
+                (record["objectId"], record_fingerprint(record))
+                for record in self._local_records(object_type)
+            ),
+            self.bucket_size,
+        )
+        ledger = bucket_hashes(
+            self._ledger(integration_id, object_type), self.bucket_size
+        )
+        buckets = local.keys() | ledger.keys()
+        if not full:
+            buckets = {b for b in buckets if local.get(b) != ledger.get(b)}
+        return sorted(buckets), len(local.keys() | ledger.keys())
+
+    def reconcile_object_type(
+        self, integration_id, object_type, repair=False, full=False
+    ):
+        """
+        Compare one object type with Gong and return its diff report.
+
+        Objects are `missing` from Gong, `stale` in Gong when their content
+        differs, or `extra` when Gong holds an object the CRM no longer has.
+        Ledger entries found to disagree with Gong are corrected. With `repair`,
+        missing and stale records are pushed and extra objects are deleted.
+        """
+        buckets, bucket_count = self.differing_buckets(
+            integration_id, object_type, full
+        )
+        report = {
+            "buckets": bucket_count,
+            "buckets_compared": len(buckets),
+            "objects_fetched": 0,
+            "missing": [],
+            "stale": [],
+            "extra": [],
+        }
+        wanted = set(buckets)
+        ledger_ids = defaultdict(list)
+        for object_id, _ in self._ledger(integration_id, object_type):
+            bucket = int(object_id) // self.bucket_size
+            if bucket in wanted:
+                ledger_ids[bucket].append(object_id)
+
+        repairs = []
+        for bucket in buckets:
+            local = {
+                record["objectId"]: record
+                for record in self._local_records(
+                    object_type, self._bucket_range(bucket)
+                )
+            }
+            object_ids = sorted(local.keys() | set(ledger_ids[bucket]), key=int)
+            gong = self.fetch_gong_records(integration_id, object_type, object_ids)
+            report["objects_fetched"] += len(object_ids)
+
+            # The ledger is corrected to what Gong actually holds, so later
+            # syncs push exactly the records that differ from it.
+            held = {}
+            for object_id in object_ids:
+                record = local.get(object_id)
+                gong_record = gong.get(object_id)
+                if gong_record is None:
+                    if record is not None:
+                        report["missing"].append(object_id)
+                        repairs.append(record)
+                    continue
+                if record is None:
+                    report["extra"].append(object_id)
+                    held[object_id] = record_fingerprint(gong_record)
+                    continue
+                # Compare only the fields we push; Gong may add its own.
+                held[object_id] = record_fingerprint(
+                    {key: gong_record.get(key) for key in record}
+                )
+                if held[object_id] != record_fingerprint(record):
+                    report["stale"].append(object_id)
+                    repairs.append(record)
+            self.gong_service.save_fingerprints(integration_id, object_type, held)
+            self.gong_service.forget_fingerprints(
+                integration_id,
+                object_type,
+                [object_id for object_id in object_ids if object_id not in held],
+            )
+
+        if repair:
+            if repairs:
+                self.gong_service.push_records_to_gong(
+                    integration_id, object_type, repairs
+                )
+            if report["extra"]:
+                self.gong_service.push_records_to_gong(
+                    integration_id, object_type, tombstones(report["extra"])
+                )
+                self.gong_service.forget_fingerprints(
+                    integration_id, object_type, report["extra"]
+                )
+        report["repaired"] = len(repairs) + len(report["extra"]) if repair else 0
+        logger.info(
+            "Reconciled %s: %d of %d buckets compared, %d missing, %d stale, "
+            "%d extra",
+            object_type,
+            report["buckets_compared"],
+            report["buckets"],
+            len(report["missing"]),
+            len(report["stale"]),
+            len(report["extra"]),
+        )
+        return report
+
+    def reconcile(self, integration_id, object_types=None, repair=False, full=False):
+        """Reconcile the given object types, all of them by default."""
+        unknown = sorted(set(object_types or ()) - set(SYNC_MODELS))
+        if unknown:
+            raise GongException(
+                f"Cannot reconcile unknown object types: {', '.join(unknown)}; "
+                f"expected one of {', '.join(SYNC_MODELS)}"
+            )
+        return {
+            object_type: self.reconcile_object_type(
+                integration_id, object_type, repair=repair, full=full
+            )
+            for object_type in object_types or SYNC_MODELS
+        }
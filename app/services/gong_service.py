@@ -1,29 +1,262 @@
+import hashlib
+import io
 import json
+import logging
+import multiprocessing
 import os
+import shutil
+import tempfile
+import threading
+import time
 import uuid
+from collections import Counter, deque, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime, timezone
-import requests
+from functools import partial
+from itertools import islice
+from sqlalchemy import Integer, cast, create_engine, func, insert, or_, select
+from sqlalchemy.orm import Session
+from app.services import fast_json
+from app.services.gong_mappers import (
+    GONG_MAPPERS,
+    compile_serializer,
+    isoformat_without_ms,
+    modified_at,
+)
+from app.services.http_client import default_timeout, get_http_session
+from app.services.sync_metrics import PhaseTimer, format_phases
 from app.db.models import (
-    User,
-    Company,
-    Contact,
-    Deal,
-    Lead,
+    GongSyncWatermark,
+    GongSchemaRegistration,
+    GongRequest,
+    GongRecordFingerprint,
+    GongDumpCheckpoint,
     IndustryEnum,
     LeadStatusEnum,
     StageEnum,
 )
 
-
-def isoformat_without_ms(dt):
-    isoformat = dt.replace(microsecond=0).isoformat()
-    return f"{isoformat}Z" if not dt.tzinfo else isoformat
+logger = logging.getLogger(__name__)
 
 
 class GongException(Exception):
     pass
 
 
+# Number of rows fetched from the database per round trip during an export.
+EXPORT_BATCH_SIZE = 1000
+
+# Serialized uploads larger than this spill from memory to an anonymous temp file.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Defaults bounding each uploaded file and how many are in flight at once.
+CHUNK_MAX_RECORDS = 50000
+CHUNK_MAX_BYTES = 50 * 1024 * 1024
+UPLOAD_CONCURRENCY = 4
+
+# Worker processes serializing primary-key ranges of a table; 0 serializes on
+# the pushing thread.
+SERIALIZE_WORKERS = 0
+
+# (connect, read) timeout for entity uploads, which Gong may take a while to accept.
+UPLOAD_TIMEOUT = (10, 300)
+
+# objectIds looked up per get_crm_objects request, and requests in flight at
+# once for longer lists.
+CRM_OBJECTS_BATCH_SIZE = 100
+CRM_OBJECTS_CONCURRENCY = 4
+
+
+def tombstones(object_ids):
+    """Return the Gong records marking the given object IDs as deleted."""
+    modified_date = isoformat_without_ms(
+        datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    return (
+        {"objectId": str(object_id), "modifiedDate": modified_date, "isDeleted": True}
+        for object_id in sorted(object_ids)
+    )
+
+
+# A serialized upload file with its size and the number and objectIds of its
+# records.
+Chunk = namedtuple(
+    "Chunk",
+    [
+        "data_file",
+        "record_count",
+        "byte_count",
+        "first_object_id",
+        "last_object_id",
+        "object_ids",
+    ],
+)
+
+
+def chunk_ldjson(
+    records, max_records=CHUNK_MAX_RECORDS, max_bytes=CHUNK_MAX_BYTES, timer=None
+):
+    """
+    Serialize an iterable of records into line-delimited JSON chunks.
+
+    Each chunk holds at most `max_records` records and `max_bytes` bytes (a
+    single oversized record still gets a chunk of its own). Chunks are spooled
+    in memory up to SPOOL_MAX_SIZE bytes and then roll over to an unnamed
+    temporary file, so concurrent exports never share a file. Chunks are
+    yielded lazily, as the records are consumed, with the file rewound. With a
+    PhaseTimer, encoding and writing each chunk is timed as its "write" phase.
+    """
+    data_file = None
+    record_count = byte_count = 0
+    write_seconds = 0.0
+    object_ids = []
+    for record in records:
+        started = time.perf_counter()
+        line = fast_json.dumps(record) + b"\n"
+        encode_seconds = time.perf_counter() - started
+        if data_file is not None and (
+            record_count >= max_records or byte_count + len(line) > max_bytes
+        ):
+            if timer is not None:
+                timer.add("write", write_seconds, rows=record_count, bytes=byte_count)
+            data_file.seek(0)
+            yield Chunk(
+                data_file,
+                record_count,
+                byte_count,
+                object_ids[0],
+                object_ids[-1],
+                object_ids,
+            )
+            data_file = None
+        if data_file is None:
+            data_file = tempfile.SpooledTemporaryFile(
+                max_size=SPOOL_MAX_SIZE, mode="w+b"
+            )
+            record_count = byte_count = 0
+            write_seconds = 0.0
+            object_ids = []
+        started = time.perf_counter()
+        data_file.write(line)
+        write_seconds += encode_seconds + time.perf_counter() - started
+        record_count += 1
+        byte_count += len(line)
+        object_ids.append(record.get("objectId"))
+    if data_file is not None:
+        if timer is not None:
+            timer.add("write", write_seconds, rows=record_count, bytes=byte_count)
+        data_file.seek(0)
+        yield Chunk(
+            data_file,
+            record_count,
+            byte_count,
+            object_ids[0],
+            object_ids[-1],
+            object_ids,
+        )
+
+
+# Number of objectIds looked up or written per fingerprint query.
+FINGERPRINT_BATCH_SIZE = 1000
+
+
+def record_fingerprint(record):
+    """
+    Hash the Gong-visible content of a record.
+
+    modifiedDate is left out, so touching `updated_at` without changing any
+    pushed field keeps the fingerprint the same.
+    """
+    content = {key: value for key, value in record.items() if key != "modifiedDate"}
+    payload = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class MultipartFileBody:
+    """
+    A multipart/form-data request body holding a single file part.
+
+    Unlike the ``files=`` argument of ``requests``, which reads the whole file
+    into memory to build the body, this wraps the file between the multipart
+    header and trailer and is read incrementally as the request is sent.
+    """
+
+    def __init__(self, field_name, filename, data_file):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+        data_file.seek(0, os.SEEK_END)
+        file_size = data_file.tell()
+        data_file.seek(0)
+
+        self._parts = [(io.BytesIO(head), len(head)), (data_file, file_size)]
+        self._parts.append((io.BytesIO(tail), len(tail)))
+        self.len = len(head) + file_size + len(tail)
+        self._position = 0
+
+    def __len__(self):
+        return self.len
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(64 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.len
+        self._position = max(0, min(offset, self.len))
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.len - self._position
+        chunks = []
+        part_start = 0
+        for part, part_size in self._parts:
+            part_end = part_start + part_size
+            if size > 0 and part_start <= self._position < part_end:
+                part.seek(self._position - part_start)
+                chunk = part.read(min(size, part_end - self._position))
+                chunks.append(chunk)
+                self._position += len(chunk)
+                size -= len(chunk)
+            part_start = part_end
+        return b"".join(chunks)
+
+
+# Gong object types synced from a table, with the model whose updated_at drives
+# incremental syncs. STAGE is derived from StageEnum and has no table.
+SYNC_MODELS = {
+    object_type: mapper.model for object_type, mapper in GONG_MAPPERS.items()
+}
+
 SCHEMA_PAYLOADS = {
     "ACCOUNT": [
         {
@@ -79,12 +312,68 @@ SCHEMA_PAYLOADS = {
 }
 
 
+def schema_payloads_hash(schema_payloads=None):
+    """
+    Return a content hash of the schema payloads.
+
+    `lastModified` is left out because it is stamped when this module is
+    imported and would otherwise change the hash in every process.
+    """
+    schema_payloads = SCHEMA_PAYLOADS if schema_payloads is None else schema_payloads
+    content = {
+        object_type: [
+            {key: value for key, value in field.items() if key != "lastModified"}
+            for field in fields
+        ]
+        for object_type, fields in schema_payloads.items()
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+# Seconds a looked-up integration ID is reused before asking Gong again.
+INTEGRATION_CACHE_TTL = int(os.getenv("GONG_INTEGRATION_CACHE_TTL", "300"))
+
+# Integration IDs by (API URL, access key), with the monotonic time they expire.
+_integration_cache = {}
+_integration_cache_lock = threading.Lock()
+
+
 class GongService:
-    def __init__(self, api_url, credentials, base_url, session):
+    def __init__(
+        self,
+        api_url,
+        credentials,
+        base_url,
+        session,
+        chunk_max_records=CHUNK_MAX_RECORDS,
+        chunk_max_bytes=CHUNK_MAX_BYTES,
+        upload_concurrency=UPLOAD_CONCURRENCY,
+        serialize_workers=SERIALIZE_WORKERS,
+        http=None,
+        timeout=None,
+        progress=None,
+    ):
+        # `http` is a requests.Session; by default the process-wide pooled one
+        # is shared so connections are kept alive across services and calls.
+        # `progress`, if given, is called as progress(event, object_type, **details)
+        # when a push starts or finishes and after each chunk is uploaded, possibly
+        # from several upload threads at once.
         self.api_url = api_url
         self.credentials = credentials
         self.base_url = base_url
         self.session = session
+        self.chunk_max_records = chunk_max_records
+        self.chunk_max_bytes = chunk_max_bytes
+        self.upload_concurrency = upload_concurrency
+        self.serialize_workers = serialize_workers
+        self.http = http if http is not None else get_http_session()
+        self.timeout = timeout if timeout is not None else default_timeout()
+        self.progress = progress
+        # Counts of new, changed, skipped and unchanged records by object type,
+        # from comparing pushed records with their stored fingerprints.
+        self.record_stats = {}
+        # PhaseTimer of each object type pushed, timing where its push spent time.
+        self.phase_timers = {}
 
     def register_crm_integration(self, name, owner_email):
         integration_payload = {
@@ -92,27 +381,49 @@ class GongService:
             "ownerEmail": owner_email,
         }
 
-        response = requests.put(
+        response = self.http.put(
             f"{self.api_url}/crm/integrations",
             json=integration_payload,
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         if response.status_code == 200:
+            # Invalidated once Gong applied the change, so a concurrent lookup
+            # cannot cache the integration it replaced.
+            self.invalidate_integration_cache()
             return response.json().get("integrationId")
         raise GongException(
             f"Failed to register CRM integration: {response.status_code} - {response.text}"
         )
 
+    def _integration_cache_key(self):
+        return (self.api_url, self.credentials[0] if self.credentials else None)
+
+    def invalidate_integration_cache(self):
+        with _integration_cache_lock:
+            _integration_cache.pop(self._integration_cache_key(), None)
+
     def get_crm_integration(self):
-        response = requests.get(
+        key = self._integration_cache_key()
+        with _integration_cache_lock:
+            cached = _integration_cache.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        response = self.http.get(
             f"{self.api_url}/crm/integrations",
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         integrations = response.json().get("integrations", [])
         if response.status_code == 200 and len(integrations) > 0:
-            return integrations[0].get("integrationId")
+            integration_id = integrations[0].get("integrationId")
+            with _integration_cache_lock:
+                _integration_cache[key] = (
+                    integration_id,
+                    time.monotonic() + INTEGRATION_CACHE_TTL,
+                )
+            return integration_id
         raise GongException(
             f"Failed to get CRM integration: {response.status_code} - {response.text}"
         )
@@ -120,26 +431,27 @@ class GongService:
     def delete_crm_integration(self, integration_id):
         params = {"clientRequestId": str(uuid.uuid4()), "integrationId": integration_id}
 
-        response = requests.delete(
+        response = self.http.delete(
             f"{self.api_url}/crm/integrations",
             headers={"Content-Type": "application/json"},
             params=params,
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         if response.status_code != 201:
             raise GongException(
                 f"Failed to delete CRM integration: {response.status_code} - {response.text}"
             )
+        self.invalidate_integration_cache()
 
     def list_schema_fields(self, integration_id, object_type):
         params = {"integrationId": integration_id, "objectType": object_type}
 
-        response = requests.get(
+        response = self.http.get(
             f"{self.api_url}/crm/entity-schema",
             params=params,
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         if response.status_code == 200:
             return response.json()
@@ -147,58 +459,365 @@ class GongService:
             f"Failed to list schema fields: {response.status_code} - {response.text}"
         )
 
-    def check_crm_schema(self, integration_id):
-        for object_type, fields in SCHEMA_PAYLOADS.items():
-            response = requests.get(
-                f"{self.api_url}/crm/entity-schema",
-                params={"integrationId": integration_id, "objectType": object_type},
-                auth=self.credentials,
-                timeout=10,
+    def _check_object_schema(self, integration_id, object_type, fields):
+        response = self.http.get(
+            f"{self.api_url}/crm/entity-schema",
+            params={"integrationId": integration_id, "objectType": object_type},
+            auth=self.credentials,
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise GongException(
+                f"Failed to check schema for {object_type}: {response.status_code} - {response.text}"
             )
-            if response.status_code == 200:
-                schema_fields = response.json()["objectTypeToSelectedFields"][
-                    object_type
-                ]
-                for field in fields:
-                    if field["uniqueName"] not in [
-                        f["uniqueName"] for f in schema_fields
-                    ]:
-                        return False
-            else:
-                raise GongException(
-                    f"Failed to check schema for {object_type}: {response.status_code} - {response.text}"
+        schema_fields = response.json()["objectTypeToSelectedFields"][object_type]
+        unique_names = {f["uniqueName"] for f in schema_fields}
+        return all(field["uniqueName"] in unique_names for field in fields)
+
+    def check_crm_schema(self, integration_id):
+        with ThreadPoolExecutor(max_workers=len(SCHEMA_PAYLOADS)) as executor:
+            checks = [
+                executor.submit(
+                    self._check_object_schema, integration_id, object_type, fields
                 )
-        return True
+                for object_type, fields in SCHEMA_PAYLOADS.items()
+            ]
+            return all(check.result() for check in checks)
+
+    def register_crm_schema(self, integration_id, force=False):
+        """
+        Register SCHEMA_PAYLOADS in Gong unless they are already registered.
+
+        The hash of the last registered payloads is stored per integration, so
+        when SCHEMA_PAYLOADS is unchanged this returns without calling Gong.
+        Returns whether Gong was checked or updated.
+        """
+        schema_hash = schema_payloads_hash()
+        registration = self.session.get(GongSchemaRegistration, str(integration_id))
+        if (
+            not force
+            and registration is not None
+            and registration.schema_hash == schema_hash
+        ):
+            return False
 
-    def register_crm_schema(self, integration_id):
         if not self.check_crm_schema(integration_id):
             for object_type, fields in SCHEMA_PAYLOADS.items():
-                response = requests.post(
+                response = self.http.post(
                     f"{self.api_url}/crm/entity-schema",
                     params={"integrationId": integration_id, "objectType": object_type},
                     json=fields,
                     auth=self.credentials,
-                    timeout=10,
+                    timeout=self.timeout,
                 )
                 if response.status_code != 200 and response.status_code != 201:
                     raise GongException(
                         f"Failed to register schema for {object_type}: {response.status_code} - {response.text}"
                     )
 
-    def fetch_data_from_db(self):
-        users = self.session.query(User).all()
-        companies = self.session.query(Company).all()
-        contacts = self.session.query(Contact).all()
-        deals = self.session.query(Deal).all()
-        leads = self.session.query(Lead).all()
-        return users, companies, contacts, deals, leads
+        self.session.merge(
+            GongSchemaRegistration(
+                integration_id=str(integration_id),
+                schema_hash=schema_hash,
+                registered_at=datetime.now(timezone.utc),
+            )
+        )
+        self.session.commit()
+        return True
+
+    def _export_filters(self, object_type, since, until, ids, id_range):
+        model = SYNC_MODELS[object_type]
+        filters = []
+        if ids is not None:
+            filters.append(model.id.in_(ids))
+        if id_range is not None:
+            # Ranges are (exclusive low, inclusive high) with None for no bound.
+            low, high = id_range
+            if low is not None:
+                filters.append(model.id > low)
+            if high is not None:
+                filters.append(model.id <= high)
+        modified = modified_at(model)
+        if since and since.get(object_type) is not None:
+            filters.append(modified > since[object_type])
+        if until and until.get(object_type) is not None:
+            # Rows without any timestamp are still part of a full dump.
+            filters.append(or_(modified <= until[object_type], modified.is_(None)))
+        return filters
+
+    def _export_query(
+        self, object_type, since=None, until=None, ids=None, id_range=None
+    ):
+        model = SYNC_MODELS[object_type]
+        statement = (
+            GONG_MAPPERS[object_type]
+            .select()
+            .where(*self._export_filters(object_type, since, until, ids, id_range))
+            .order_by(model.id)
+        )
+        return self.session.execute(
+            statement, execution_options={"yield_per": EXPORT_BATCH_SIZE}
+        )
+
+    def shard_ranges(
+        self, object_type, since=None, until=None, shard_rows=None, after=None
+    ):
+        """
+        Split the rows of an export into primary-key ranges of `shard_rows` rows.
+
+        Yields (exclusive low, inclusive high) ID bounds covering every row
+        with an ID above `after` exactly once, in ID order; the last range is
+        open-ended.
+        """
+        shard_rows = shard_rows or self.chunk_max_records
+        model = SYNC_MODELS[object_type]
+        filters = self._export_filters(object_type, since, until, None, (after, None))
+        statement = select(model.id).where(*filters).order_by(model.id)
+        low = after
+        count = 0
+        with self.session.execute(
+            statement, execution_options={"yield_per": EXPORT_BATCH_SIZE}
+        ) as result:
+            for count, object_id in enumerate(result.scalars(), 1):
+                if count % shard_rows == 0:
+                    yield (low, object_id)
+                    low = object_id
+        if count % shard_rows:
+            yield (low, None)
+
+    def get_high_water_marks(self):
+        return {
+            object_type: self.session.query(func.max(modified_at(model))).scalar()
+            for object_type, model in SYNC_MODELS.items()
+        }
+
+    def get_watermarks(self, integration_id):
+        watermarks = self.session.query(GongSyncWatermark).filter(
+            GongSyncWatermark.integration_id == str(integration_id)
+        )
+        return {w.object_type: w.high_water_mark for w in watermarks}
+
+    def save_watermark(self, integration_id, object_type, high_water_mark):
+        if high_water_mark is None:
+            return
+        self.session.merge(
+            GongSyncWatermark(
+                integration_id=str(integration_id),
+                object_type=object_type,
+                high_water_mark=high_water_mark,
+            )
+        )
+        self.session.commit()
+
+    def get_checkpoint(self, job_id, object_type):
+        return self.session.get(GongDumpCheckpoint, (job_id, object_type))
+
+    def start_checkpoint(self, job_id, object_type, high_water_mark):
+        checkpoint = GongDumpCheckpoint(
+            job_id=job_id,
+            object_type=object_type,
+            high_water_mark=high_water_mark,
+            chunks_acknowledged=0,
+            rows_acknowledged=0,
+            completed=False,
+        )
+        self.session.add(checkpoint)
+        self.session.commit()
+        return checkpoint
+
+    def acknowledge_chunk(self, job_id, object_type, chunk):
+        """Advance a checkpoint past a chunk accepted by Gong."""
+        with self._side_session() as session:
+            session.query(GongDumpCheckpoint).filter(
+                GongDumpCheckpoint.job_id == job_id,
+                GongDumpCheckpoint.object_type == object_type,
+            ).update(
+                {
+                    GongDumpCheckpoint.last_object_id: int(chunk.last_object_id),
+                    GongDumpCheckpoint.chunks_acknowledged: (
+                        GongDumpCheckpoint.chunks_acknowledged + 1
+                    ),
+                    GongDumpCheckpoint.rows_acknowledged: (
+                        GongDumpCheckpoint.rows_acknowledged + chunk.record_count
+                    ),
+                },
+                synchronize_session=False,
+            )
+            session.commit()
+
+    def push_object_type(
+        self,
+        integration_id,
+        object_type,
+        since=None,
+        until=None,
+        dedupe=False,
+        job_id=None,
+    ):
+        """
+        Push one object type for an optional updated_at window.
+
+        When `until` is given, the object type's watermark is advanced to it once
+        the upload succeeds. With `dedupe`, records whose content has not changed
+        since they were last pushed are skipped. With `job_id`, progress is
+        checkpointed as Gong accepts each chunk, and an object type the job
+        already pushed in part continues after its checkpoint, with the same
+        `until`, or is skipped if it was completed.
+        """
+        after = None
+        on_acknowledged = None
+        if job_id is not None:
+            checkpoint = self.get_checkpoint(job_id, object_type)
+            if checkpoint is None:
+                checkpoint = self.start_checkpoint(
+                    job_id, object_type, until.get(object_type) if until else None
+                )
+            elif checkpoint.completed:
+                return []
+            elif checkpoint.high_water_mark is not None:
+                until = {**(until or {}), object_type: checkpoint.high_water_mark}
+            after = checkpoint.last_object_id
+            on_acknowledged = partial(self.acknowledge_chunk, job_id, object_type)
+
+        self._report_progress("push_started", object_type)
+        timer = self.phase_timer(object_type)
+        started = time.perf_counter()
+        if object_type == "STAGE":
+            responses = self.push_stages_to_gong(
+                integration_id, dedupe=dedupe, on_acknowledged=on_acknowledged
+            )
+        elif self.serialize_workers > 1:
+            responses = self.push_sharded(
+                integration_id,
+                object_type,
+                since,
+                until,
+                dedupe=dedupe,
+                after=after,
+                on_acknowledged=on_acknowledged,
+            )
+        else:
+            # Closing the result ends its read transaction even if an upload
+            # fails part way through the export.
+            with self._export_query(
+                object_type, since, until, id_range=(after, None)
+            ) as rows:
+                responses = self.push_rows_to_gong(
+                    integration_id,
+                    object_type,
+                    rows,
+                    dedupe=dedupe,
+                    on_acknowledged=on_acknowledged,
+                )
+        if until and object_type != "STAGE":
+            self.save_watermark(integration_id, object_type, until.get(object_type))
+        if job_id is not None:
+            checkpoint.completed = True
+            self.session.commit()
+        written = timer.as_dict().get("write", {})
+        timer.add(
+            "total",
+            time.perf_counter() - started,
+            rows=written.get("rows", 0),
+            bytes=written.get("bytes", 0),
+        )
+        phases = timer.as_dict()
+        logger.info(
+            "gong_push object_type=%s chunks=%d %s",
+            object_type,
+            len(responses),
+            format_phases(phases),
+        )
+        self._report_progress("push_finished", object_type, phases=phases)
+        return responses
+
+    def sync_plan(self, integration_id, incremental=False):
+        """
+        Work out which object types to push and their updated_at windows.
+
+        Returns `(object_types, since, until)`. A full dump pushes every object
+        type; an incremental sync skips object types with no rows modified since
+        their watermark, and only pushes stages on an integration's first sync.
+        """
+        until = self.get_high_water_marks()
+        if not incremental:
+            return ["STAGE", *SYNC_MODELS], None, until
+
+        since = self.get_watermarks(integration_id)
+        object_types = [] if since else ["STAGE"]
+        for object_type in SYNC_MODELS:
+            high_water_mark = until[object_type]
+            watermark = since.get(object_type)
+            if high_water_mark is not None and (
+                watermark is None or high_water_mark > watermark
+            ):
+                object_types.append(object_type)
+        return object_types, since, until
+
+    def push_changes(self, integration_id, upserts, deletes):
+        """
+        Push the current state of changed entities and tombstones for deleted ones.
+
+        `upserts` and `deletes` map object types to collections of IDs. Object
+        types are pushed in SYNC_MODELS order so business users and accounts are
+        in Gong before the entities referencing them. Upserted entities that no
+        longer exist are skipped; their deletion is pushed separately, as are
+        upserts whose Gong content is unchanged.
+        """
+        responses = {}
+        for object_type in SYNC_MODELS:
+            object_responses = []
+            if upserts.get(object_type):
+                with self._export_query(
+                    object_type, ids=list(upserts[object_type])
+                ) as rows:
+                    object_responses += self.push_rows_to_gong(
+                        integration_id, object_type, rows, dedupe=True
+                    )
+            if deletes.get(object_type):
+                object_responses += self.push_records_to_gong(
+                    integration_id, object_type, tombstones(deletes[object_type])
+                )
+                if self.session is not None:
+                    self.forget_fingerprints(
+                        integration_id, object_type, map(str, deletes[object_type])
+                    )
+            if object_responses:
+                responses[object_type] = object_responses
+        return responses
+
+    def full_db_dump(self, integration_id, job_id=None):
+        object_types, since, until = self.sync_plan(integration_id)
+        return {
+            object_type: self.push_object_type(
+                integration_id, object_type, since, until, job_id=job_id
+            )
+            for object_type in object_types
+        }
+
+    def incremental_sync(self, integration_id):
+        """
+        Push only the rows modified since the last successful upload.
+
+        Each object type is uploaded for the window between its stored watermark
+        and the current maximum `updated_at`, and its watermark is advanced as
+        soon as that upload succeeds. Rows whose Gong content is unchanged since
+        their last push are skipped.
+        """
+        object_types, since, until = self.sync_plan(integration_id, incremental=True)
+        return {
+            object_type: self.push_object_type(
+                integration_id, object_type, since, until, dedupe=True
+            )
+            for object_type in object_types
+        }
 
     def check_request_status(self, integration_id, request_id):
-        response = requests.get(
+        response = self.http.get(
             f"{self.api_url}/crm/request-status",
             params={"integrationId": integration_id, "clientRequestId": request_id},
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         if response.status_code == 200:
             if response.json().get("status") != "FAILED":
@@ -210,20 +829,34 @@ class GongService:
             f"Failed to check request status: {response.status_code} - {response.text}"
         )
 
-    def push_data_to_gong(self, integration_id, object_type, data_file):
+    def push_data_to_gong(
+        self, integration_id, object_type, data_file, client_request_id=None
+    ):
         params = {
-            "clientRequestId": str(uuid.uuid4()),
+            "clientRequestId": client_request_id or str(uuid.uuid4()),
             "integrationId": integration_id,
             "objectType": object_type,
         }
-        files = {"dataFile": data_file}
+        body = MultipartFileBody("dataFile", f"{object_type.lower()}.ldjson", data_file)
 
-        response = requests.post(
-            f"{self.api_url}/crm/entities",
-            params=params,
-            files=files,
-            auth=self.credentials,
-            timeout=10,
+        with self.phase_timer(object_type).time("upload", bytes=len(body)) as upload:
+            response = self.http.post(
+                f"{self.api_url}/crm/entities",
+                params=params,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                auth=self.credentials,
+                timeout=UPLOAD_TIMEOUT,
+            )
+            upload["status"] = response.status_code
+        logger.debug(
+            "gong_upload object_type=%s client_request_id=%s status=%d bytes=%d "
+            "seconds=%.3f",
+            object_type,
+            params["clientRequestId"],
+            response.status_code,
+            len(body),
+            response.elapsed.total_seconds(),
         )
         if response.status_code != 200 and response.status_code != 201:
             raise GongException(
@@ -231,155 +864,382 @@ class GongService:
             )
         return response.json()
 
-    def push_stages_to_gong(self, integration_id):
-        with open("stages.ldjson", "w", encoding="utf-8") as f:
-            stages = [
-                {
-                    "objectId": str(i),
-                    "name": stage.name,
-                    "isActive": True,
-                    "sortOrder": i + 1,
-                }
-                for i, stage in enumerate(StageEnum)
-            ]
-            for stage in stages:
-                f.write(json.dumps(stage) + "\n")
-
-        response = self.push_data_to_gong(
-            integration_id, "STAGE", open("stages.ldjson", "rb")
-        )
-
-        os.remove("stages.ldjson")
+    def phase_timer(self, object_type):
+        """Return the PhaseTimer of an object type's pushes by this service."""
+        return self.phase_timers.setdefault(object_type, PhaseTimer(object_type))
 
-        return response
+    def _report_progress(self, event, object_type, **details):
+        if self.progress is not None:
+            self.progress(event, object_type, **details)
 
-    def push_users_to_gong(self, integration_id, users):
-        with open("users.ldjson", "w", encoding="utf-8") as f:
-            for user in users:
-                user_data = {
-                    "objectId": str(user.id),
-                    "modifiedDate": isoformat_without_ms(user.updated_at),
-                    "isDeleted": False,
-                    "url": f"{self.base_url}/users/{user.id}",
-                    "emailAddress": user.email,
-                }
-                f.write(json.dumps(user_data) + "\n")
+    def record_request(
+        self,
+        integration_id,
+        object_type,
+        chunk_index,
+        chunk,
+        client_request_id,
+        response,
+    ):
+        """Add an accepted upload to the gong_requests ledger."""
+        # Uploads run on worker threads, so the ledger gets its own session.
+        with Session(bind=self.session.get_bind()) as session:
+            session.add(
+                GongRequest(
+                    integration_id=str(integration_id),
+                    client_request_id=client_request_id,
+                    request_id=response.get("requestId"),
+                    object_type=object_type,
+                    chunk_index=chunk_index,
+                    first_object_id=chunk.first_object_id,
+                    last_object_id=chunk.last_object_id,
+                    record_count=chunk.record_count,
+                )
+            )
+            session.commit()
 
-        response = self.push_data_to_gong(
-            integration_id, "BUSINESS_USER", open("users.ldjson", "rb")
-        )
+    def _side_session(self):
+        # Fingerprints and checkpoints are read while the export query is still
+        # streaming and written from upload threads, so they get sessions of
+        # their own.
+        return Session(bind=self.session.get_bind())
 
-        os.remove("users.ldjson")
+    def get_fingerprints(self, integration_id, object_type, object_ids):
+        """Return the stored fingerprints of the given objectIds."""
+        with self._side_session() as session:
+            return dict(
+                session.query(
+                    GongRecordFingerprint.object_id, GongRecordFingerprint.payload_hash
+                ).filter(
+                    GongRecordFingerprint.integration_id == str(integration_id),
+                    GongRecordFingerprint.object_type == object_type,
+                    GongRecordFingerprint.object_id.in_(object_ids),
+                )
+            )
 
-        return response
+    def save_fingerprints(self, integration_id, object_type, fingerprints):
+        """Store the fingerprints of pushed records, given by objectId."""
+        if not fingerprints:
+            return
+        with self._side_session() as session:
+            for object_ids in batched(fingerprints, FINGERPRINT_BATCH_SIZE):
+                session.query(GongRecordFingerprint).filter(
+                    GongRecordFingerprint.integration_id == str(integration_id),
+                    GongRecordFingerprint.object_type == object_type,
+                    GongRecordFingerprint.object_id.in_(object_ids),
+                ).delete(synchronize_session=False)
+            session.execute(
+                insert(GongRecordFingerprint),
+                [
+                    {
+                        "integration_id": str(integration_id),
+                        "object_type": object_type,
+                        "object_id": object_id,
+                        "payload_hash": payload_hash,
+                    }
+                    for object_id, payload_hash in fingerprints.items()
+                ],
+            )
+            session.commit()
 
-    def push_companies_to_gong(self, integration_id, companies):
-        with open("companies.ldjson", "w", encoding="utf-8") as f:
-            for company in companies:
-                company_data = {
-                    "objectId": str(company.id),
-                    "modifiedDate": isoformat_without_ms(company.updated_at),
-                    "isDeleted": False,
-                    "url": f"{self.base_url}/companies/{company.id}",
-                    "name": company.name,
-                    "domains": [domain.name for domain in company.domains],
-                    "industry": company.industry.name,
-                }
-                f.write(json.dumps(company_data) + "\n")
+    def forget_fingerprints(self, integration_id, object_type, object_ids):
+        """Drop the fingerprints of deleted objects."""
+        with self._side_session() as session:
+            for batch in batched(object_ids, FINGERPRINT_BATCH_SIZE):
+                session.query(GongRecordFingerprint).filter(
+                    GongRecordFingerprint.integration_id == str(integration_id),
+                    GongRecordFingerprint.object_type == object_type,
+                    GongRecordFingerprint.object_id.in_(batch),
+                ).delete(synchronize_session=False)
+            session.commit()
 
-        response = self.push_data_to_gong(
-            integration_id, "ACCOUNT", open("companies.ldjson", "rb")
-        )
+    def forget_fingerprint_range(
+        self, integration_id, object_type, first_object_id, last_object_id
+    ):
+        """
+        Drop the fingerprints of the objects in a chunk Gong failed to process.
 
-        os.remove("companies.ldjson")
+        Their records are pushed again by the next sync instead of being skipped
+        as unchanged.
+        """
+        object_id = cast(GongRecordFingerprint.object_id, Integer)
+        with self._side_session() as session:
+            session.query(GongRecordFingerprint).filter(
+                GongRecordFingerprint.integration_id == str(integration_id),
+                GongRecordFingerprint.object_type == object_type,
+                object_id.between(int(first_object_id), int(last_object_id)),
+            ).delete(synchronize_session=False)
+            session.commit()
 
-        return response
+    def _compare_fingerprints(
+        self, integration_id, object_type, records, pending, dedupe
+    ):
+        """
+        Yield the records that should be pushed, counting them in `record_stats`.
 
-    def push_contacts_to_gong(self, integration_id, contacts):
-        with open("contacts.ldjson", "w", encoding="utf-8") as f:
-            for contact in contacts:
-                contact_data = {
-                    "objectId": str(contact.id),
-                    "modifiedDate": isoformat_without_ms(contact.updated_at),
-                    "isDeleted": False,
-                    "url": f"{self.base_url}/contacts/{contact.id}",
-                    "accountId": str(contact.company_id),
-                    "emailAddress": contact.email,
-                    "firstName": contact.first_name,
-                    "lastName": contact.last_name,
-                    "phoneNumber": contact.phone,
+        New and changed fingerprints are added to `pending`, to be saved once the
+        chunk holding their record is accepted by Gong. With `dedupe`, records
+        matching their stored fingerprint are skipped.
+        """
+        stats = self.record_stats.setdefault(object_type, Counter())
+        timer = self.phase_timer(object_type)
+        for batch in batched(records, FINGERPRINT_BATCH_SIZE):
+            with timer.time("fingerprint", rows=len(batch)):
+                fingerprints = {
+                    record["objectId"]: record_fingerprint(record) for record in batch
                 }
-                f.write(json.dumps(contact_data) + "\n")
+                pushed = self.get_fingerprints(
+                    integration_id, object_type, list(fingerprints)
+                )
+            for record in batch:
+                object_id = record["objectId"]
+                previous = pushed.get(object_id)
+                if previous is None:
+                    stats["new"] += 1
+                elif previous != fingerprints[object_id]:
+                    stats["changed"] += 1
+                elif dedupe:
+                    stats["skipped"] += 1
+                    continue
+                else:
+                    stats["unchanged"] += 1
+                if previous != fingerprints[object_id]:
+                    pending[object_id] = fingerprints[object_id]
+                yield record
 
+    def _upload_chunk(
+        self, integration_id, object_type, chunk_index, chunk, fingerprints=None
+    ):
+        client_request_id = str(uuid.uuid4())
+        with chunk.data_file:
             response = self.push_data_to_gong(
-                integration_id, "CONTACT", open("contacts.ldjson", "rb")
+                integration_id, object_type, chunk.data_file, client_request_id
             )
-
-        os.remove("contacts.ldjson")
-
+        response.setdefault("clientRequestId", client_request_id)
+        if self.session is not None:
+            self.record_request(
+                integration_id,
+                object_type,
+                chunk_index,
+                chunk,
+                client_request_id,
+                response,
+            )
+        if fingerprints:
+            with self.phase_timer(object_type).time(
+                "fingerprint", rows=len(fingerprints)
+            ):
+                self.save_fingerprints(integration_id, object_type, fingerprints)
+        self._report_progress(
+            "chunk_uploaded",
+            object_type,
+            rows=chunk.record_count,
+            bytes=chunk.byte_count,
+            response=response,
+        )
         return response
 
-    def push_deals_to_gong(self, integration_id, deals):
-        with open("deals.ldjson", "w", encoding="utf-8") as f:
-            for deal in deals:
-                deal_data = {
-                    "objectId": str(deal.id),
-                    "modifiedDate": isoformat_without_ms(deal.updated_at),
-                    "isDeleted": False,
-                    "url": f"{self.base_url}/deals/{deal.id}",
-                    "accountId": str(deal.company_id),
-                    "ownerId": str(deal.owner_id),
-                    "name": deal.title,
-                    "createdDate": isoformat_without_ms(deal.open_date),
-                    "closeDate": (
-                        isoformat_without_ms(deal.close_date)
-                        if deal.close_date
-                        else None
-                    ),
-                    "status": deal.status.name.upper(),
-                    "stage": deal.stage.name,
-                    "amount": deal.amount,
-                    "description": deal.description,
-                }
-                f.write(json.dumps(deal_data) + "\n")
+    def push_records_to_gong(
+        self, integration_id, object_type, records, dedupe=False, on_acknowledged=None
+    ):
+        """
+        Upload records of one object type as size-bounded chunks.
 
-            response = self.push_data_to_gong(
-                integration_id, "DEAL", open("deals.ldjson", "rb")
+        Chunks are serialized on the calling thread while up to
+        `upload_concurrency` of them are uploaded in parallel, each with its own
+        clientRequestId and recorded in the gong_requests ledger. The content
+        hash of every pushed record is kept in gong_record_fingerprints, and with
+        `dedupe` records whose hash has not changed are not uploaded again.
+        Returns the Gong responses in chunk order.
+        """
+        pending = {}
+        if self.session is not None:
+            records = self._compare_fingerprints(
+                integration_id, object_type, records, pending, dedupe
+            )
+        chunks = (
+            (
+                chunk,
+                {
+                    object_id: pending.pop(object_id)
+                    for object_id in chunk.object_ids
+                    if object_id in pending
+                },
             )
+            for chunk in chunk_ldjson(
+                records,
+                self.chunk_max_records,
+                self.chunk_max_bytes,
+                timer=self.phase_timer(object_type),
+            )
+        )
+        return self.upload_chunks(integration_id, object_type, chunks, on_acknowledged)
 
-        os.remove("deals.ldjson")
+    def upload_chunks(self, integration_id, object_type, chunks, on_acknowledged=None):
+        """
+        Upload `(chunk, fingerprints)` pairs, up to `upload_concurrency` at once.
 
-        return response
+        `chunks` is consumed lazily, so no more than `upload_concurrency` chunks
+        wait for an upload at a time. `on_acknowledged(chunk)`, if given, is
+        called in chunk order for each chunk once it and every chunk before it
+        were accepted. Returns the Gong responses in chunk order.
+        """
+        futures = []
+        in_flight = set()
+        acknowledged = {}
+        acknowledged_lock = threading.Lock()
+        next_index = 0
 
-    def push_leads_to_gong(self, integration_id, leads):
-        with open("leads.ldjson", "w", encoding="utf-8") as f:
-            for lead in leads:
-                lead_data = {
-                    "objectId": str(lead.id),
-                    "modifiedDate": isoformat_without_ms(lead.updated_at),
-                    "isDeleted": False,
-                    "url": f"{self.base_url}/leads/{lead.id}",
-                    "emailAddress": lead.email,
-                    "firstName": lead.first_name,
-                    "lastName": lead.last_name,
-                    "phoneNumber": lead.phone,
-                    "ownerId": str(lead.owner_id),
-                    "status": lead.status.name,
-                    "account": lead.company,
-                    "details": lead.details,
-                }
-                f.write(json.dumps(lead_data) + "\n")
+        def acknowledge(chunk_index, chunk, future):
+            nonlocal next_index
+            if future.cancelled() or future.exception() is not None:
+                return
+            with acknowledged_lock:
+                acknowledged[chunk_index] = chunk
+                while next_index in acknowledged:
+                    on_acknowledged(acknowledged.pop(next_index))
+                    next_index += 1
 
-            response = self.push_data_to_gong(
-                integration_id, "LEAD", open("leads.ldjson", "rb")
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            try:
+                for chunk_index, (chunk, fingerprints) in enumerate(chunks):
+                    if len(in_flight) >= self.upload_concurrency:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    future = executor.submit(
+                        self._upload_chunk,
+                        integration_id,
+                        object_type,
+                        chunk_index,
+                        chunk,
+                        fingerprints,
+                    )
+                    if on_acknowledged is not None:
+                        future.add_done_callback(
+                            partial(acknowledge, chunk_index, chunk)
+                        )
+                    futures.append(future)
+                    in_flight.add(future)
+                return [future.result() for future in futures]
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    def _serialized_shards(
+        self, integration_id, object_type, since, until, dedupe, after
+    ):
+        database_url = self.session.get_bind().url.render_as_string(hide_password=False)
+        with serialize_pool(self.serialize_workers) as pool:
+            ranges = self.shard_ranges(object_type, since, until, after=after)
+            stats = self.record_stats.setdefault(object_type, Counter())
+
+            def submit(id_range):
+                return pool.submit(
+                    serialize_shard,
+                    database_url,
+                    self.base_url,
+                    integration_id,
+                    object_type,
+                    since,
+                    until,
+                    id_range,
+                    self.chunk_max_records,
+                    self.chunk_max_bytes,
+                    dedupe,
+                )
+
+            # Keep at most two shards per worker serialized ahead of the uploads,
+            # so a large table is not spooled to disk all at once.
+            shards = deque(
+                submit(id_range)
+                for id_range in islice(ranges, 2 * self.serialize_workers)
             )
+            shard_chunks = deque()
+            try:
+                while shards:
+                    shard_chunks, shard_stats, shard_phases = shards.popleft().result()
+                    shard_chunks = deque(shard_chunks)
+                    id_range = next(ranges, None)
+                    if id_range is not None:
+                        shards.append(submit(id_range))
+                    stats.update(shard_stats)
+                    self.phase_timer(object_type).merge(shard_phases)
+                    while shard_chunks:
+                        shard_chunk = shard_chunks.popleft()
+                        data_file = open(shard_chunk.path, "rb")
+                        os.unlink(shard_chunk.path)
+                        yield shard_chunk.chunk._replace(data_file=data_file), (
+                            shard_chunk.fingerprints
+                        )
+            finally:
+                # Remove the files of shards that will not be uploaded.
+                discard_shard_chunks(shard_chunks)
+                for future in shards:
+                    if not future.cancel() and future.exception() is None:
+                        discard_shard_chunks(future.result()[0])
 
-        os.remove("leads.ldjson")
+    def push_sharded(
+        self,
+        integration_id,
+        object_type,
+        since=None,
+        until=None,
+        dedupe=False,
+        after=None,
+        on_acknowledged=None,
+    ):
+        """
+        Serialize one object type in worker processes and upload the chunks.
 
-        return response
+        The export is split into primary-key ranges of `chunk_max_records` rows,
+        each serialized by one of `serialize_workers` processes over its own
+        database connection. Ranges do not overlap and their chunks are uploaded
+        in ID order, so every row is uploaded exactly once, in the same order as
+        an in-process push.
+        """
+        chunks = self._serialized_shards(
+            integration_id, object_type, since, until, dedupe, after
+        )
+        return self.upload_chunks(integration_id, object_type, chunks, on_acknowledged)
+
+    def push_stages_to_gong(self, integration_id, dedupe=False, on_acknowledged=None):
+        stages = (
+            {
+                "objectId": str(i),
+                "name": stage.name,
+                "isActive": True,
+                "sortOrder": i + 1,
+            }
+            for i, stage in enumerate(StageEnum)
+        )
+        return self.push_records_to_gong(
+            integration_id,
+            "STAGE",
+            stages,
+            dedupe=dedupe,
+            on_acknowledged=on_acknowledged,
+        )
+
+    def push_rows_to_gong(
+        self, integration_id, object_type, rows, dedupe=False, on_acknowledged=None
+    ):
+        """Serialize rows with the object type's Gong mapper and upload them."""
+        timer = self.phase_timer(object_type)
+        serialize = compile_serializer(object_type, self.base_url)
+        with timer.timed_iter("query", rows) as rows, timer.timed_call(
+            "serialize", serialize
+        ) as serialize:
+            return self.push_records_to_gong(
+                integration_id,
+                object_type,
+                map(serialize, rows),
+                dedupe=dedupe,
+                on_acknowledged=on_acknowledged,
+            )
 
-    def get_crm_objects(self, integration_id, object_type, object_ids):
-        response = requests.get(
+    def _get_crm_objects_batch(self, integration_id, object_type, object_ids):
+        response = self.http.get(
             f"{self.api_url}/crm/entities",
             params={
                 "integrationId": integration_id,
@@ -387,10 +1247,197 @@ class GongService:
             },
             json=list(map(str, object_ids)),
             auth=self.credentials,
-            timeout=10,
+            timeout=self.timeout,
         )
         if response.status_code == 200:
-            return response.json()
+            return fast_json.loads(response.content)
         raise GongException(
             f"Failed to get CRM objects: {response.status_code} - {response.text}"
         )
+
+    def iter_crm_objects(
+        self,
+        integration_id,
+        object_type,
+        object_ids,
+        batch_size=CRM_OBJECTS_BATCH_SIZE,
+        concurrency=CRM_OBJECTS_CONCURRENCY,
+    ):
+        """
+        Look up objectIds in batches of `batch_size`, `concurrency` at a time.
+
+        Yields Gong's response to each batch, in batch order. Only `concurrency`
+        responses are held at once, however long `object_ids` is.
+        """
+        batches = batched(object_ids, batch_size)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = deque()
+            try:
+                for batch in batches:
+                    in_flight.append(
+                        executor.submit(
+                            self._get_crm_objects_batch,
+                            integration_id,
+                            object_type,
+                            batch,
+                        )
+                    )
+                    if len(in_flight) >= concurrency:
+                        yield in_flight.popleft().result()
+                while in_flight:
+                    yield in_flight.popleft().result()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    def get_crm_objects(
+        self,
+        integration_id,
+        object_type,
+        object_ids,
+        batch_size=CRM_OBJECTS_BATCH_SIZE,
+        concurrency=CRM_OBJECTS_CONCURRENCY,
+    ):
+        """
+        Return Gong's stored objects for `object_ids` as one response.
+
+        Long lists are fetched in concurrent batches and their crmObjectsMaps
+        merged; the requestId is that of the first batch.
+        """
+        merged = {"requestId": None, "crmObjectsMap": {}}
+        for response in self.iter_crm_objects(
+            integration_id, object_type, object_ids, batch_size, concurrency
+        ):
+            if merged["requestId"] is None:
+                merged["requestId"] = response.get("requestId")
+            merged["crmObjectsMap"].update(response.get("crmObjectsMap") or {})
+        return merged
+
+
+# A chunk serialized by a worker process, spooled to the file at `path`, with
+# the fingerprints of its new and changed records.
+ShardChunk = namedtuple("ShardChunk", ["path", "chunk", "fingerprints"])
+
+# The serialization pool shared by every push in this process, its number of
+# workers, and the number of pushes using each pool still open.
+_serialize_pool = None
+_serialize_pool_workers = None
+_serialize_pool_users = Counter()
+_serialize_pool_lock = threading.Lock()
+
+# Database engines of a serialization worker process, by URL.
+_worker_engines = {}
+
+
+@contextmanager
+def serialize_pool(workers):
+    """
+    Use the process-wide pool of `workers` serialization processes.
+
+    One pool is kept per process. Asking for another size replaces it, and the
+    replaced pool is shut down once the last push using it is done.
+    """
+    global _serialize_pool, _serialize_pool_workers
+    with _serialize_pool_lock:
+        if _serialize_pool is None or _serialize_pool_workers != workers:
+            if (
+                _serialize_pool is not None
+                and not _serialize_pool_users[_serialize_pool]
+            ):
+                _serialize_pool.shutdown(wait=False)
+            # Workers are spawned rather than forked, as forking a process
+            # running upload and job threads can copy locks held by them.
+            _serialize_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _serialize_pool_workers = workers
+        pool = _serialize_pool
+        _serialize_pool_users[pool] += 1
+    try:
+        yield pool
+    finally:
+        with _serialize_pool_lock:
+            _serialize_pool_users[pool] -= 1
+            retired = pool is not _serialize_pool and not _serialize_pool_users[pool]
+        if retired:
+            pool.shutdown(wait=False)
+
+
+def discard_shard_chunks(shard_chunks):
+    for shard_chunk in shard_chunks:
+        try:
+            os.unlink(shard_chunk.path)
+        except FileNotFoundError:
+            pass
+
+
+def serialize_shard(
+    database_url,
+    base_url,
+    integration_id,
+    object_type,
+    since,
+    until,
+    id_range,
+    chunk_max_records,
+    chunk_max_bytes,
+    dedupe,
+):
+    """
+    Serialize one primary-key range of an export in a worker process.
+
+    Returns the range's chunks as ShardChunks, spooled to named temporary files
+    for the parent process to upload, with the range's record counts and phase
+    timings.
+    """
+    if database_url not in _worker_engines:
+        _worker_engines[database_url] = create_engine(database_url)
+    with Session(bind=_worker_engines[database_url]) as session:
+        gong_service = GongService(
+            None,
+            None,
+            base_url,
+            session,
+            chunk_max_records=chunk_max_records,
+            chunk_max_bytes=chunk_max_bytes,
+        )
+        # Timings are only returned to the parent, which adds them to its metrics.
+        timer = gong_service.phase_timers[object_type] = PhaseTimer(
+            object_type, metrics=None
+        )
+        rows = gong_service._export_query(object_type, since, until, id_range=id_range)
+        pending = {}
+        with timer.timed_iter("query", rows) as rows, timer.timed_call(
+            "serialize", compile_serializer(object_type, base_url)
+        ) as serialize:
+            records = gong_service._compare_fingerprints(
+                integration_id, object_type, map(serialize, rows), pending, dedupe
+            )
+            shard_chunks = []
+            try:
+                for chunk in chunk_ldjson(
+                    records, chunk_max_records, chunk_max_bytes, timer=timer
+                ):
+                    with chunk.data_file, tempfile.NamedTemporaryFile(
+                        prefix="gong-chunk-", suffix=".ldjson", delete=False
+                    ) as shard_file:
+                        shard_chunks.append(
+                            ShardChunk(
+                                shard_file.name,
+                                chunk._replace(data_file=None),
+                                {
+                                    object_id: pending.pop(object_id)
+                                    for object_id in chunk.object_ids
+                                    if object_id in pending
+                                },
+                            )
+                        )
+                        shutil.copyfileobj(chunk.data_file, shard_file)
+            except BaseException:
+                discard_shard_chunks(shard_chunks)
+                raise
+        return (
+            shard_chunks,
+            dict(gong_service.record_stats.get(object_type, {})),
+            timer.as_dict(),
+        )
@@ -0,0 +1,129 @@
+import os
+import threading
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.rate_limiter import get_rate_limiter
+
+# Defaults for the pooled HTTP session used for Gong API traffic.
+HTTP_POOL_SIZE = int(os.getenv("GONG_HTTP_POOL_SIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("GONG_HTTP_MAX_RETRIES", "5"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("GONG_HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_BACKOFF_JITTER = float(os.getenv("GONG_HTTP_BACKOFF_JITTER", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("GONG_HTTP_BACKOFF_MAX", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("GONG_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("GONG_HTTP_READ_TIMEOUT", "30"))
+
+# Responses that indicate a transient failure worth retrying.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def default_timeout():
+    return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedRetry(Retry):
+    """Retry that reports throttled responses and rate limits each retry."""
+
+    def __init__(self, *args, rate_limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def new(self, **kw):
+        kw.setdefault("rate_limiter", self.rate_limiter)
+        return super().new(**kw)
+
+    def increment(self, method=None, url=None, response=None, *args, **kwargs):
+        if response is not None and response.status == 429:
+            self.rate_limiter.throttled(retry_after_seconds(response))
+        return super().increment(method, url, response, *args, **kwargs)
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        self.rate_limiter.acquire()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a rate limiter token for every request it sends."""
+
+    def __init__(self, rate_limiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire()
+        response = super().send(request, **kwargs)
+        if response.status_code < 400:
+            self.rate_limiter.succeeded()
+        return response
+
+
+def create_http_session(
+    pool_size=HTTP_POOL_SIZE,
+    max_retries=HTTP_MAX_RETRIES,
+    backoff_factor=HTTP_BACKOFF_FACTOR,
+    backoff_jitter=HTTP_BACKOFF_JITTER,
+    backoff_max=HTTP_BACKOFF_MAX,
+    rate_limiter=None,
+):
+    """
+    Create a keep-alive `requests.Session` with a bounded connection pool.
+
+    Failed connections and responses in RETRY_STATUS_CODES are retried up to
+    `max_retries` times with exponential backoff plus random jitter, honoring
+    any `Retry-After` header sent with a 429 or 503. Every Gong call is either
+    idempotent or carries a clientRequestId, so all methods are retried. The
+    last response is returned rather than raised so callers keep reporting the
+    Gong status and message themselves.
+
+    With a `rate_limiter`, every attempt, retries included, waits for a token
+    and throttled responses slow the limiter down.
+    """
+    retry_options = {}
+    adapter_class = HTTPAdapter
+    if rate_limiter is not None:
+        retry_options["rate_limiter"] = rate_limiter
+        adapter_class = partial(RateLimitedAdapter, rate_limiter)
+    retry = (RateLimitedRetry if rate_limiter is not None else Retry)(
+        total=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=None,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        backoff_max=backoff_max,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        **retry_options,
+    )
+    adapter = adapter_class(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session():
+    """
+    Return the process-wide pooled HTTP session, creating it on first use.
+
+    Its requests are limited by the process-wide Gong rate limiter.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = create_http_session(rate_limiter=get_rate_limiter())
+    return _shared_session
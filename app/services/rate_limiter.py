@@ -0,0 +1,203 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# Requests per second sent to the Gong API. Gong allows 3 per second per
+# company; 0 disables client-side rate limiting.
+RATE_LIMIT = float(os.getenv("GONG_RATE_LIMIT", "3"))
+# Requests that may be sent at once after an idle period.
+RATE_LIMIT_BURST = float(os.getenv("GONG_RATE_LIMIT_BURST", "3"))
+# The rate never backs off below this many requests per second.
+RATE_LIMIT_MIN = float(os.getenv("GONG_RATE_LIMIT_MIN", "0.1"))
+# Factor the rate is multiplied by when Gong throttles a request.
+RATE_LIMIT_BACKOFF = float(os.getenv("GONG_RATE_LIMIT_BACKOFF", "0.5"))
+# Requests per second the rate recovers by after each successful request.
+RATE_LIMIT_RAMP = float(os.getenv("GONG_RATE_LIMIT_RAMP", "0.05"))
+# SQLite file holding a bucket shared by every process using the same path.
+# Unset, each process has a bucket of its own.
+RATE_LIMIT_FILE = os.getenv("GONG_RATE_LIMIT_FILE")
+
+# State of a token bucket. `rate` is the current, adapted refill rate and no
+# tokens are handed out before `blocked_until`. Times are Unix timestamps so
+# they mean the same in every process sharing a bucket.
+BucketState = namedtuple(
+    "BucketState", ["tokens", "updated_at", "rate", "blocked_until"]
+)
+
+
+class LocalBucket:
+    """Token bucket state shared by the threads of one process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+
+    def update(self, change):
+        """
+        Replace the state with `change(state)`, atomically.
+
+        `change` returns the new state and a result passed back to the caller.
+        The state is None until first set.
+        """
+        with self.lock:
+            self.state, result = change(self.state)
+            return result
+
+
+class SQLiteBucket:
+    """
+    Token bucket state stored in a SQLite file and shared across processes.
+
+    Every update runs in an immediate transaction, so processes take tokens
+    from the bucket one at a time.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_bucket ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated_at REAL, "
+            "rate REAL, blocked_until REAL)"
+        )
+
+    def update(self, change):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                row = cursor.execute(
+                    "SELECT tokens, updated_at, rate, blocked_until "
+                    "FROM rate_limit_bucket WHERE id = 1"
+                ).fetchone()
+                state, result = change(BucketState(*row) if row else None)
+                cursor.execute(
+                    "INSERT OR REPLACE INTO rate_limit_bucket "
+                    "(id, tokens, updated_at, rate, blocked_until) "
+                    "VALUES (1, ?, ?, ?, ?)",
+                    state,
+                )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+            return result
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket limiting the rate of requests, adapted to the server's quota.
+
+    Each request takes a token; tokens refill at the current rate up to
+    `burst`. A throttled request (429) multiplies the rate by `backoff` and,
+    with a Retry-After, stops every request until it has passed. Each
+    successful request then adds `ramp` requests per second back, up to
+    `rate`. Buckets given the same SQLite file are shared by every process
+    using it.
+    """
+
+    def __init__(
+        self,
+        rate=RATE_LIMIT,
+        burst=RATE_LIMIT_BURST,
+        min_rate=RATE_LIMIT_MIN,
+        backoff=RATE_LIMIT_BACKOFF,
+        ramp=RATE_LIMIT_RAMP,
+        bucket=None,
+    ):
+        self.max_rate = rate
+        self.burst = max(burst, 1)
+        # A rate of 0 would never refill the bucket.
+        self.min_rate = min(max(min_rate, 0.01), rate)
+        self.backoff = backoff
+        self.ramp = ramp
+        self.bucket = bucket if bucket is not None else LocalBucket()
+
+    def _refill(self, state, now):
+        if state is None:
+            return BucketState(self.burst, now, self.max_rate, 0.0)
+        elapsed = max(now - state.updated_at, 0.0)
+        tokens = min(self.burst, state.tokens + elapsed * state.rate)
+        return state._replace(tokens=tokens, updated_at=now)
+
+    def _take(self, state):
+        # Returns the seconds to wait before trying again, or 0 once a token
+        # was taken.
+        now = time.time()
+        state = self._refill(state, now)
+        if now < state.blocked_until:
+            return state, state.blocked_until - now
+        if state.tokens >= 1:
+            return state._replace(tokens=state.tokens - 1), 0
+        return state, (1 - state.tokens) / state.rate
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            wait = self.bucket.update(self._take)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        """Back off after the server throttled a request."""
+
+        def back_off(state):
+            now = time.time()
+            state = self._refill(state, now)
+            blocked_until = state.blocked_until
+            if retry_after:
+                blocked_until = max(blocked_until, now + retry_after)
+            rate = max(self.min_rate, state.rate * self.backoff)
+            return (
+                state._replace(tokens=0, rate=rate, blocked_until=blocked_until),
+                None,
+            )
+
+        self.bucket.update(back_off)
+
+    def succeeded(self):
+        """Ramp the rate back up after a request was accepted."""
+
+        def ramp_up(state):
+            state = self._refill(state, time.time())
+            return state._replace(rate=min(self.max_rate, state.rate + self.ramp)), None
+
+        self.bucket.update(ramp_up)
+
+    def current_rate(self):
+        """Return the adapted rate, in requests per second."""
+
+        def read(state):
+            state = self._refill(state, time.time())
+            return state, state.rate
+
+        return self.bucket.update(read)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide rate limiter for Gong API traffic.
+
+    Returns None when GONG_RATE_LIMIT is 0. With GONG_RATE_LIMIT_FILE set, the
+    limiter's bucket is shared with every other process using that file.
+    """
+    global _shared_limiter
+    if RATE_LIMIT <= 0:
+        return None
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                bucket = SQLiteBucket(RATE_LIMIT_FILE) if RATE_LIMIT_FILE else None
+                _shared_limiter = AdaptiveRateLimiter(bucket=bucket)
+    return _shared_limiter
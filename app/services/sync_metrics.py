@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Phases of a Gong push, in the order records pass through them.
+#   query: waiting on the database for export rows
+#   serialize: turning rows into Gong records
+#   fingerprint: looking up and saving record fingerprints
+#   write: encoding records and writing them to chunk files
+#   upload: HTTP uploads of chunk files, summed over upload threads
+#   total: the whole push of an object type, wall-clock
+PHASES = ("query", "serialize", "fingerprint", "write", "upload", "total")
+
+
+def empty_phase():
+    return {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0, "statuses": Counter()}
+
+
+class SyncMetrics:
+    """Process-wide totals of every phase timed, for scraping as metrics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}
+
+    def record(self, object_type, phase, calls, seconds, rows, bytes, statuses=None):
+        with self.lock:
+            totals = self.phases.setdefault((object_type, phase), empty_phase())
+            totals["calls"] += calls
+            totals["seconds"] += seconds
+            totals["rows"] += rows
+            totals["bytes"] += bytes
+            if statuses:
+                totals["statuses"].update(statuses)
+
+    def render_prometheus(self):
+        """Return the totals in the Prometheus text exposition format."""
+        metrics = (
+            ("calls", "gong_sync_phase_calls_total", "Phases timed"),
+            ("seconds", "gong_sync_phase_seconds_total", "Seconds spent in phases"),
+            ("rows", "gong_sync_phase_rows_total", "Rows passed through phases"),
+            ("bytes", "gong_sync_phase_bytes_total", "Bytes passed through phases"),
+        )
+        with self.lock:
+            phases = sorted(self.phases.items())
+            lines = []
+            for key, name, description in metrics:
+                lines += [f"# HELP {name} {description}.", f"# TYPE {name} counter"]
+                for (object_type, phase), totals in phases:
+                    lines.append(
+                        f'{name}{{object_type="{object_type}",phase="{phase}"}} '
+                        f"{totals[key]}"
+                    )
+            name = "gong_sync_http_responses_total"
+            lines += [
+                f"# HELP {name} Gong API responses by status.",
+                f"# TYPE {name} counter",
+            ]
+            for (object_type, phase), totals in phases:
+                for status, count in sorted(totals["statuses"].items()):
+                    lines.append(
+                        f'{name}{{object_type="{object_type}",phase="{phase}",'
+                        f'status="{status}"}} {count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+sync_metrics = SyncMetrics()
+
+
+class PhaseTimer:
+    """
+    Times the phases of pushing one object type.
+
+    Phases may be timed from several threads at once. Every measurement is
+    also added to the process-wide `sync_metrics`.
+    """
+
+    def __init__(self, object_type, metrics=sync_metrics):
+        self.object_type = object_type
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.phases = {}
+
+    def add(self, phase, seconds, rows=0, bytes=0, status=None, calls=1, statuses=None):
+        """
+        Add one measurement of `phase`.
+
+        `status` is the HTTP status of a single call; `statuses` maps statuses
+        to counts, for measurements covering several calls.
+        """
+        statuses = Counter(statuses)
+        if status is not None:
+            statuses[status] += 1
+        with self.lock:
+            totals = self.phases.setdefault(phase, empty_phase())
+            totals["calls"] += calls
+            totals["seconds"] += seconds
+            totals["rows"] += rows
+            totals["bytes"] += bytes
+            totals["statuses"].update(statuses)
+        if self.metrics is not None:
+            self.metrics.record(
+                self.object_type, phase, calls, seconds, rows, bytes, statuses
+            )
+
+    @contextmanager
+    def time(self, phase, rows=0, bytes=0):
+        """
+        Time a block as one call of `phase`.
+
+        The block may set `status` on the yielded dict to record an HTTP status.
+        """
+        details = {}
+        started = time.perf_counter()
+        try:
+            yield details
+        finally:
+            self.add(
+                phase,
+                time.perf_counter() - started,
+                rows=rows,
+                bytes=bytes,
+                status=details.get("status"),
+            )
+
+    @contextmanager
+    def timed_iter(self, phase, iterable):
+        """Yield `iterable` with the time spent producing each item added to `phase`."""
+        totals = {"seconds": 0.0, "rows": 0}
+
+        def timed():
+            iterator = iter(iterable)
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    totals["seconds"] += time.perf_counter() - started
+                    return
+                totals["seconds"] += time.perf_counter() - started
+                totals["rows"] += 1
+                yield item
+
+        try:
+            yield timed()
+        finally:
+            self.add(phase, totals["seconds"], rows=totals["rows"])
+
+    @contextmanager
+    def timed_call(self, phase, function):
+        """Yield `function` with the time spent in each call added to `phase`."""
+        totals = {"seconds": 0.0, "rows": 0}
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals["seconds"] += time.perf_counter() - started
+                totals["rows"] += 1
+
+        try:
+            yield timed
+        finally:
+            self.add(phase, totals["seconds"], rows=totals["rows"])
+
+    def merge(self, phases):
+        """Add phases measured elsewhere, such as in a worker process, from `as_dict`."""
+        for phase, totals in phases.items():
+            self.add(
+                phase,
+                totals["seconds"],
+                rows=totals["rows"],
+                bytes=totals["bytes"],
+                calls=totals["calls"],
+                # `as_dict` turns statuses into strings for JSON.
+                statuses={
+                    int(status): count
+                    for status, count in totals.get("statuses", {}).items()
+                },
+            )
+
+    def as_dict(self):
+        """Return the phases timed so far as plain, JSON-serializable dicts."""
+        with self.lock:
+            return {
+                phase: {
+                    "calls": totals["calls"],
+                    "seconds": round(totals["seconds"], 6),
+                    "rows": totals["rows"],
+                    "bytes": totals["bytes"],
+                    "statuses": {
+                        str(status): count
+                        for status, count in sorted(totals["statuses"].items())
+                    },
+                }
+                for phase, totals in sorted(
+                    self.phases.items(), key=lambda item: PHASES.index(item[0])
+                )
+            }
+
+
+def format_phases(phases):
+    """Format `as_dict` phases as logfmt key=value pairs."""
+    fields = []
+    for phase, totals in phases.items():
+        fields.append(f"{phase}_seconds={totals['seconds']:.3f}")
+        if totals["rows"]:
+            fields.append(f"{phase}_rows={totals['rows']}")
+        if totals["bytes"]:
+            fields.append(f"{phase}_bytes={totals['bytes']}")
+        for status, count in totals["statuses"].items():
+            fields.append(f"{phase}_status_{status}={count}")
+    return " ".join(fields)
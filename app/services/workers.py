@@ -0,0 +1,48 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """
+    Base class for background workers that call `run_once` on an interval.
+
+    Subclasses implement `run_once` and may override `next_interval` to vary
+    the wait between rounds. Errors are logged and the worker keeps running;
+    `stop` waits for the current round to finish.
+    """
+
+    name = "periodic-worker"
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def next_interval(self):
+        return self.interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("%s failed", self.name)
+            self._stop.wait(self.next_interval())
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
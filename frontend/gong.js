@@ -1,3 +1,5 @@
+const JOB_POLL_INTERVAL_MS = 2000;
+
 async function pushToGong() {
     try {
         const response = await fetch(`${BASE_URL}/gong/full_db_dump`, {
@@ -7,13 +9,38 @@ async function pushToGong() {
             },
         });
 
+        if (response.status === 409) {
+            const result = await response.json();
+            throw new Error(result.detail);
+        }
         if (!response.ok) {
             throw new Error('Failed to push data to Gong');
         }
 
-        const result = await response.json();
-        alert(result.message);
+        const job = await waitForGongJob(await response.json());
+        if (job.status === 'failed') {
+            throw new Error(`Failed to push data to Gong: ${job.error}`);
+        }
+        alert(`Full database dump completed successfully: ${job.rows_serialized} records in ${job.chunks_uploaded} uploads.`);
     } catch (error) {
         alert(error.message);
     }
-}
\ No newline at end of file
+}
+
+async function waitForGongJob(job) {
+    while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        const response = await fetch(`${BASE_URL}/gong/jobs/${job.id}`, {
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('token')}`,
+            },
+        });
+
+        if (!response.ok) {
+            throw new Error('Failed to get Gong job status');
+        }
+
+        job = await response.json();
+    }
+    return job;
+}
@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import Base
+from app.db.models import (
+    User,
+    Company,
+    Domain,
+    Contact,
+    Deal,
+    Lead,
+    IndustryEnum,
+    LeadStatusEnum,
+    StageEnum,
+    StatusEnum,
+)
+from app.services.async_gong_service import AsyncGongService, PUSH_DEPENDENCIES
+from app.services.gong_service import (
+    GongService,
+    CHUNK_MAX_RECORDS,
+    CHUNK_MAX_BYTES,
+    UPLOAD_CONCURRENCY,
+    SERIALIZE_WORKERS,
+)
+from app.services.http_client import create_http_session, HTTP_POOL_SIZE
+from app.services.rate_limiter import AdaptiveRateLimiter
+from scripts.mock_gong_server import create_server
+
+# Rows inserted per statement while seeding.
+SEED_BATCH_SIZE = 5000
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def insert_batched(session, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= SEED_BATCH_SIZE:
+            session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        session.execute(insert(model), batch)
+
+
+def seed(session, rows):
+    """Insert `rows` users, companies, contacts, deals and leads."""
+    now = datetime.now(timezone.utc)
+    industries = list(IndustryEnum)
+    stages = list(StageEnum)
+    statuses = list(StatusEnum)
+    lead_statuses = list(LeadStatusEnum)
+
+    insert_batched(
+        session,
+        User,
+        (
+            {
+                "id": i,
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "phone": f"+1555{i:07d}",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "password": "x",
+                "salt": "x",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, rows + 1)
+        ),
+    )
+    insert_batched(
+        session,
+        Company,
+        (
+            {
+                "id": i,
+                "name": f"Company {i}",
+                "industry": industries[i % len(industries)],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, rows + 1)
+        ),
+    )
+    insert_batched(
+        session,
+        Domain,
+        (
+            {"name": f"company{i}.example.com", "company_id": i}
+            for i in range(1, rows + 1)
+        ),
+    )
+    insert_batched(
+        session,
+        Contact,
+        (
+            {
+                "id": i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"contact{i}@example.com",
+                "phone": f"+1555{i:07d}",
+                "company_id": random.randint(1, rows),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, rows + 1)
+        ),
+    )
+    insert_batched(
+        session,
+        Deal,
+        (
+            {
+                "id": i,
+                "title": f"Deal {i}",
+                "amount": random.randint(1000, 1000000),
+                "open_date": now - timedelta(days=random.randint(0, 365)),
+                "company_id": random.randint(1, rows),
+                "owner_id": random.randint(1, rows),
+                "stage": stages[i % len(stages)],
+                "status": statuses[i % len(statuses)],
+                "description": f"Description of deal {i}",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, rows + 1)
+        ),
+    )
+    insert_batched(
+        session,
+        Lead,
+        (
+            {
+                "id": i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "company": f"Prospect {i}",
+                "email": f"lead{i}@example.com",
+                "phone": f"+1555{i:07d}",
+                "details": f"Details of lead {i}",
+                "owner_id": random.randint(1, rows),
+                "status": lead_statuses[i % len(lead_statuses)],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, rows + 1)
+        ),
+    )
+    session.commit()
+
+
+class BenchmarkProgress:
+    """GongService progress callback timing each object type's push."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = {}
+
+    def __call__(self, event, object_type, **details):
+        with self.lock:
+            result = self.results.setdefault(
+                object_type, {"rows": 0, "bytes": 0, "chunks": 0}
+            )
+            if event == "push_started":
+                result["started"] = time.perf_counter()
+            elif event == "push_finished":
+                result["seconds"] = time.perf_counter() - result["started"]
+                result["peak_rss_mb"] = peak_rss_mb()
+            elif event == "chunk_uploaded":
+                result["rows"] += details["rows"]
+                result["bytes"] += details["bytes"]
+                result["chunks"] += 1
+
+
+def serve_mock_gong(options, ports):
+    server = create_server(**options)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+def start_mock_gong(**options):
+    """Start the mock Gong server in a child process and return it with its URL."""
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_mock_gong, args=(options, ports), daemon=True
+    )
+    process.start()
+    return process, f"http://127.0.0.1:{ports.get(timeout=30)}/v2"
+
+
+def format_report(results, total_seconds):
+    lines = [
+        f"{'object type':<14}{'rows':>10}{'MB':>10}{'chunks':>8}{'wall s':>10}"
+        f"{'rows/s':>12}{'MB/s':>10}{'peak RSS MB':>13}"
+    ]
+    for object_type, result in results.items():
+        megabytes = result["bytes"] / (1024 * 1024)
+        seconds = result["seconds"]
+        lines.append(
+            f"{object_type:<14}{result['rows']:>10}{megabytes:>10.2f}"
+            f"{result['chunks']:>8}{seconds:>10.3f}"
+            f"{result['rows'] / seconds if seconds else 0:>12.0f}"
+            f"{megabytes / seconds if seconds else 0:>10.2f}"
+            f"{result['peak_rss_mb']:>13.1f}"
+        )
+    rows = sum(result["rows"] for result in results.values())
+    megabytes = sum(result["bytes"] for result in results.values()) / (1024 * 1024)
+    lines.append(
+        f"{'total':<14}{rows:>10}{megabytes:>10.2f}"
+        f"{sum(result['chunks'] for result in results.values()):>8}"
+        f"{total_seconds:>10.3f}{rows / total_seconds:>12.0f}"
+        f"{megabytes / total_seconds:>10.2f}{peak_rss_mb():>13.1f}"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Benchmark full_db_dump throughput against a local mock Gong server.
+
+    Seeds a fresh database with `--rows` rows of each entity, runs a full
+    database dump against scripts/mock_gong_server.py in a child process and
+    reports rows/sec, MB/sec, wall time and peak RSS per object type. Object
+    types are pushed concurrently, so per-type times overlap and the peak RSS
+    is that of the whole benchmark process when each push finished.
+
+    Arguments:
+    - --rows (int, optional): Rows seeded per entity. Defaults to 10000.
+    - --database_url (str, optional): Empty database to seed. Defaults to a temporary SQLite file.
+    - --chunk_max_records (int, optional): Maximum records per uploaded file.
+    - --chunk_max_bytes (int, optional): Maximum bytes per uploaded file.
+    - --concurrency (int, optional): Number of files uploaded in parallel per object type.
+    - --serialize_workers (int, optional): Number of processes serializing each table.
+    - --latency (float, optional): Seconds the mock server adds to every response.
+    - --error_rate (float, optional): Fraction of mock server responses that are 500s.
+    - --throttle_rate (float, optional): Fraction of mock server responses that are 429s.
+    - --quota (int, optional): Requests per second the mock server serves before answering with 429s.
+    - --rate_limit (float, optional): Requests per second allowed by the client-side rate limiter. Defaults to no limit.
+    - --json (flag, optional): Print the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description="Gong sync throughput benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--database_url")
+    parser.add_argument("--chunk_max_records", type=int, default=CHUNK_MAX_RECORDS)
+    parser.add_argument("--chunk_max_bytes", type=int, default=CHUNK_MAX_BYTES)
+    parser.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY)
+    parser.add_argument("--serialize_workers", type=int, default=SERIALIZE_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error_rate", type=float, default=0.0)
+    parser.add_argument("--throttle_rate", type=float, default=0.0)
+    parser.add_argument("--quota", type=int)
+    parser.add_argument("--rate_limit", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    database_dir = None
+    database_url = args.database_url
+    if database_url is None:
+        database_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{database_dir.name}/benchmark.db"
+    engine = create_engine(database_url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        seed(session, args.rows)
+    seed_seconds = time.perf_counter() - started
+
+    server, api_url = start_mock_gong(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        quota=args.quota,
+        retry_after=0,
+        store_objects=False,
+    )
+    http = create_http_session(
+        pool_size=max(HTTP_POOL_SIZE, args.concurrency * len(PUSH_DEPENDENCIES)),
+        rate_limiter=(
+            AdaptiveRateLimiter(rate=args.rate_limit, burst=args.rate_limit)
+            if args.rate_limit > 0
+            else None
+        ),
+    )
+    credentials = ("benchmark", "benchmark")
+    progress = BenchmarkProgress()
+    try:
+        with SessionLocal() as session:
+            integration_id = GongService(
+                api_url, credentials, "http://localhost:8000", session, http=http
+            ).register_crm_integration("Benchmark", "benchmark@example.com")
+
+        async_gong_service = AsyncGongService(
+            SessionLocal,
+            api_url,
+            credentials,
+            "http://localhost:8000",
+            chunk_max_records=args.chunk_max_records,
+            chunk_max_bytes=args.chunk_max_bytes,
+            upload_concurrency=args.concurrency,
+            serialize_workers=args.serialize_workers,
+            http=http,
+            progress=progress,
+        )
+        started = time.perf_counter()
+        asyncio.run(async_gong_service.full_db_dump(integration_id))
+        total_seconds = time.perf_counter() - started
+    finally:
+        server.terminate()
+        http.close()
+        engine.dispose()
+        if database_dir is not None:
+            database_dir.cleanup()
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "rows": args.rows,
+                    "seed_seconds": seed_seconds,
+                    "total_seconds": total_seconds,
+                    "peak_rss_mb": peak_rss_mb(),
+                    "object_types": {
+                        object_type: {
+                            key: value
+                            for key, value in result.items()
+                            if key != "started"
+                        }
+                        for object_type, result in progress.results.items()
+                    },
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(f"Seeded {args.rows} rows per entity in {seed_seconds:.2f}s")
+        print(format_report(progress.results, total_seconds))
+
+
+if __name__ == "__main__":
+    main()
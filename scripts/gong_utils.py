@@ -2,13 +2,32 @@ import json
 import sys
 import os
 import argparse
+import asyncio
+import logging
+import signal
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.gong_service import GongService
+from app.services.gong_service import (
+    GongService,
+    CHUNK_MAX_RECORDS,
+    CHUNK_MAX_BYTES,
+    UPLOAD_CONCURRENCY,
+    SERIALIZE_WORKERS,
+    SYNC_MODELS,
+)
+from app.services.async_gong_service import AsyncGongService
+from app.services.gong_outbox import GongOutboxWorker
+from app.services.gong_reconcile import GongReconciler
+from app.services.gong_daemon import GongSyncDaemon, SYNC_INTERVAL, SYNC_JITTER
+from app.services.gong_jobs import GongJobRunner, GongJobConflict, GongJobNotFound
+from app.db.models import GongSyncJob, JobStatusEnum
+from app.services.http_client import create_http_session, HTTP_POOL_SIZE
+from app.services.rate_limiter import get_rate_limiter
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +47,16 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def print_phase_timings(phase_timings):
+    for object_type, phases in phase_timings.items():
+        print(
+            f"{object_type}: "
+            + ", ".join(
+                f"{phase} {totals['seconds']:.2f}s" for phase, totals in phases.items()
+            )
+        )
+
+
 def main():
     """
     Main function for the Gong CRM Integration CLI.
@@ -36,7 +65,11 @@ def main():
     The available actions are:
     - register_integration: Registers a new CRM integration and prints the integration ID.
     - update_schema: Updates the CRM schema for the integration.
-    - full_db_dump: Performs a full database dump and pushes data to Gong.
+    - full_db_dump: Performs a full database dump and pushes data to Gong as a resumable job.
+    - incremental_sync: Pushes only the rows modified since the last successful upload.
+    - sync: Runs an incremental sync as a job, or with --watch keeps running them on an interval until SIGTERM.
+    - drain_outbox: Pushes the entity changes and deletions recorded in the outbox.
+    - reconcile: Reports objects missing from, stale in or extra in Gong, and optionally repairs them.
     - view_schema: Views the schema fields for different object types.
     - check_request_status: Checks the status of a request using the provided request ID.
     - get_crm_objects: Retrieves CRM objects based on the provided object type and object IDs.
@@ -48,20 +81,34 @@ def main():
         - "register_integration"
         - "update_schema"
         - "full_db_dump"
+        - "incremental_sync"
+        - "sync"
+        - "drain_outbox"
+        - "reconcile"
         - "view_schema"
         - "check_request_status"
         - "get_crm_objects"
         - "delete_integration"
         - "view_integration_id"
     - --request_id (str, optional): Request ID to check status (required for check_request_status action).
-    - --object_type (str, optional): Object type to retrieve (required for get_crm_objects action).
+    - --object_type (str, optional): Object type to retrieve (required for get_crm_objects action) or to reconcile (reconcile action, all by default).
     - --object_ids (str, optional): Comma-separated list of object IDs to retrieve (required for get_crm_objects action).
     - --integration_name (str, optional): Name of the integration (required for register_integration action).
     - --owner_email (str, optional): Owner email of the integration (required for register_integration action).
     - --integration_id (str, optional): Integration ID to delete (required for delete_integration action).
+    - --chunk_max_records (int, optional): Maximum records per uploaded file (full_db_dump and incremental_sync actions).
+    - --chunk_max_bytes (int, optional): Maximum bytes per uploaded file (full_db_dump and incremental_sync actions).
+    - --concurrency (int, optional): Number of files uploaded in parallel (full_db_dump and incremental_sync actions).
+    - --serialize_workers (int, optional): Number of processes serializing each table in primary-key ranges (full_db_dump and incremental_sync actions).
+    - --resume (int, optional): ID of a failed full_db_dump job to continue from its checkpoints (full_db_dump action).
+    - --repair (flag, optional): Push the missing and stale records and delete the extra objects found (reconcile action).
+    - --full (flag, optional): Compare every object rather than only buckets that differ from the fingerprint ledger (reconcile action).
+    - --watch (flag, optional): Keep syncing every --interval seconds, while no other daemon holds the integration's lease (sync action).
+    - --interval (float, optional): Seconds between syncs (sync action with --watch).
+    - --jitter (float, optional): Up to this many random seconds added to each interval (sync action with --watch).
 
     Usage:
-        python gong_utils.py <action> [--request_id REQUEST_ID] [--object_type OBJECT_TYPE] [--object_ids OBJECT_IDS] [--integration_name INTEGRATION_NAME] [--owner_email OWNER_EMAIL] [--integration_id INTEGRATION_ID]
+        python gong_utils.py <action> [--request_id REQUEST_ID] [--object_type OBJECT_TYPE] [--object_ids OBJECT_IDS] [--integration_name INTEGRATION_NAME] [--owner_email OWNER_EMAIL] [--integration_id INTEGRATION_ID] [--chunk_max_records N] [--chunk_max_bytes N] [--concurrency N]
     """
     parser = argparse.ArgumentParser(description="Gong CRM Integration CLI")
     parser.add_argument(
@@ -70,6 +117,10 @@ def main():
             "register_integration",
             "update_schema",
             "full_db_dump",
+            "incremental_sync",
+            "sync",
+            "drain_outbox",
+            "reconcile",
             "view_schema",
             "check_request_status",
             "get_crm_objects",
@@ -84,8 +135,8 @@ def main():
     )
     parser.add_argument(
         "--object_type",
-        help="Object type to retrieve (required for get_crm_objects action)",
-        choices=["ACCOUNT", "CONTACT", "DEAL", "LEAD"],
+        help="Object type to retrieve (required for get_crm_objects action) or to reconcile (reconcile action, all by default)",
+        choices=list(SYNC_MODELS),
     )
     parser.add_argument(
         "--object_ids",
@@ -103,10 +154,94 @@ def main():
         "--integration_id",
         help="Integration ID to delete (required for delete_integration action)",
     )
+    parser.add_argument(
+        "--chunk_max_records",
+        type=int,
+        default=CHUNK_MAX_RECORDS,
+        help="Maximum records per uploaded file",
+    )
+    parser.add_argument(
+        "--chunk_max_bytes",
+        type=int,
+        default=CHUNK_MAX_BYTES,
+        help="Maximum bytes per uploaded file",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=UPLOAD_CONCURRENCY,
+        help="Number of files uploaded in parallel",
+    )
+    parser.add_argument(
+        "--serialize_workers",
+        type=int,
+        default=SERIALIZE_WORKERS,
+        help="Number of processes serializing each table in primary-key ranges",
+    )
+    parser.add_argument(
+        "--resume",
+        type=int,
+        metavar="JOB",
+        help="ID of a failed full_db_dump job to continue from its checkpoints",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Push missing and stale records and delete extra objects (reconcile)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Compare every object with Gong, not only changed buckets (reconcile)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running incremental syncs until SIGTERM (sync)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=SYNC_INTERVAL,
+        help="Seconds between syncs (sync --watch)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=SYNC_JITTER,
+        help="Up to this many random seconds added to each interval (sync --watch)",
+    )
     args = parser.parse_args()
 
     session = SessionLocal()
-    gong_service = GongService(GONG_API_URL, credentials, BASE_URL, session)
+    http = create_http_session(
+        pool_size=max(HTTP_POOL_SIZE, args.concurrency),
+        rate_limiter=get_rate_limiter(),
+    )
+    service_options = {
+        "chunk_max_records": args.chunk_max_records,
+        "chunk_max_bytes": args.chunk_max_bytes,
+        "upload_concurrency": args.concurrency,
+        "serialize_workers": args.serialize_workers,
+        "http": http,
+    }
+    gong_service = GongService(
+        GONG_API_URL, credentials, BASE_URL, session, **service_options
+    )
+    async_gong_service = AsyncGongService(
+        SessionLocal, GONG_API_URL, credentials, BASE_URL, **service_options
+    )
+    job_runner = GongJobRunner(
+        SessionLocal,
+        lambda progress: AsyncGongService(
+            SessionLocal,
+            GONG_API_URL,
+            credentials,
+            BASE_URL,
+            progress=progress,
+            **service_options,
+        ),
+    )
 
     if args.action == "register_integration":
         if not args.integration_name or not args.owner_email:
@@ -121,22 +256,113 @@ def main():
 
     elif args.action == "update_schema":
         integration_id = gong_service.get_crm_integration()
-        gong_service.register_crm_schema(integration_id)
-        print("Schema updated successfully.")
+        if gong_service.register_crm_schema(integration_id):
+            print("Schema updated successfully.")
+        else:
+            print("Schema is already up to date.")
 
     elif args.action == "full_db_dump":
         integration_id = gong_service.get_crm_integration()
-        users, companies, contacts, deals, leads = gong_service.fetch_data_from_db()
-        responses = []
-        responses.append(gong_service.push_stages_to_gong(integration_id))
-        responses.append(gong_service.push_users_to_gong(integration_id, users))
-        responses.append(gong_service.push_companies_to_gong(integration_id, companies))
-        responses.append(gong_service.push_contacts_to_gong(integration_id, contacts))
-        responses.append(gong_service.push_deals_to_gong(integration_id, deals))
-        responses.append(gong_service.push_leads_to_gong(integration_id, leads))
-        print("Full database dump completed successfully.")
-        for response in responses:
-            print(response)
+        try:
+            job_id = job_runner.run(
+                integration_id, "full_db_dump", resume_job_id=args.resume
+            )
+        except (GongJobConflict, GongJobNotFound) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        job = session.get(GongSyncJob, job_id)
+        if job.status != JobStatusEnum.succeeded:
+            print(f"Full database dump job {job_id} failed: {job.error}")
+            print(f"Run full_db_dump with --resume {job_id} to continue it.")
+            sys.exit(1)
+        print(f"Full database dump job {job_id} completed successfully.")
+        for object_type, chunk_responses in job.responses.items():
+            for response in chunk_responses:
+                print(f"{object_type}: {response}")
+        print_phase_timings(job.phase_timings or {})
+
+    elif args.action == "incremental_sync":
+        integration_id = gong_service.get_crm_integration()
+        responses = asyncio.run(async_gong_service.incremental_sync(integration_id))
+        print("Incremental sync completed successfully.")
+        for object_type, chunk_responses in responses.items():
+            for response in chunk_responses:
+                print(f"{object_type}: {response}")
+        for object_type, stats in async_gong_service.record_stats.items():
+            print(
+                f"{object_type}: {stats['new']} new, {stats['changed']} changed, "
+                f"{stats['skipped']} skipped"
+            )
+        print_phase_timings(async_gong_service.phase_timings)
+
+    elif args.action == "sync" and args.watch:
+        # The database and HTTP pools above stay open between syncs.
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+        )
+        integration_id = gong_service.get_crm_integration()
+        daemon = GongSyncDaemon(
+            SessionLocal,
+            job_runner,
+            integration_id,
+            interval=args.interval,
+            jitter=args.jitter,
+        )
+        stopping = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: stopping.set())
+        print(f"Syncing integration {integration_id} every {args.interval:g}s.")
+        daemon.start()
+        stopping.wait()
+        print("Stopping after the current sync...")
+        daemon.stop()
+
+    elif args.action == "sync":
+        integration_id = gong_service.get_crm_integration()
+        try:
+            job_id = job_runner.run(integration_id, "incremental_sync")
+        except GongJobConflict as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        job = session.get(GongSyncJob, job_id)
+        if job.status != JobStatusEnum.succeeded:
+            print(f"Incremental sync job {job_id} failed: {job.error}")
+            sys.exit(1)
+        print(
+            f"Incremental sync job {job_id} pushed {job.rows_serialized} rows "
+            "successfully."
+        )
+        print_phase_timings(job.phase_timings or {})
+
+    elif args.action == "drain_outbox":
+        outbox_worker = GongOutboxWorker(
+            SessionLocal,
+            lambda outbox_session: GongService(
+                GONG_API_URL, credentials, BASE_URL, outbox_session, **service_options
+            ),
+        )
+        drained = outbox_worker.drain()
+        print(f"Drained {drained} outbox entries.")
+
+    elif args.action == "reconcile":
+        integration_id = gong_service.get_crm_integration()
+        reports = GongReconciler(gong_service).reconcile(
+            integration_id,
+            [args.object_type] if args.object_type else None,
+            repair=args.repair,
+            full=args.full,
+        )
+        for object_type, report in reports.items():
+            print(
+                f"{object_type}: compared {report['buckets_compared']} of "
+                f"{report['buckets']} buckets, fetched {report['objects_fetched']} "
+                f"objects; {len(report['missing'])} missing, "
+                f"{len(report['stale'])} stale, {len(report['extra'])} extra"
+                + (f", {report['repaired']} repaired" if args.repair else "")
+            )
+            for kind in ("missing", "stale", "extra"):
+                if report[kind]:
+                    print(f"  {kind}: {', '.join(report[kind])}")
 
     elif args.action == "view_schema":
         integration_id = gong_service.get_crm_integration()
@@ -181,8 +407,9 @@ def main():
         integration_id = gong_service.get_crm_integration()
         print(f"Integration ID: {integration_id}")
 
-    # Close database session
+    # Close database session and HTTP connections
     session.close()
+    http.close()
 
 
 if __name__ == "__main__":
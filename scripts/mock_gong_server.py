@@ -0,0 +1,396 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockGongState:
+    """
+    In-memory state of the mock Gong CRM API.
+
+    Uploaded requests stay PROCESSING for `processing_delay` seconds before
+    they are reported as DONE, or FAILED when a line of the upload is not a
+    JSON object with an objectId. With `store_objects` off, uploads are only
+    validated and counted, which keeps the server small for benchmarks. With a
+    `quota`, requests beyond that many in the last second are throttled.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        latency_jitter=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        retry_after=1,
+        processing_delay=0.0,
+        store_objects=True,
+        quota=None,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.processing_delay = processing_delay
+        self.store_objects = store_objects
+        self.quota = quota
+        self.recent_requests = deque()
+        self.lock = threading.Lock()
+        self.integrations = {}
+        self.schemas = {}
+        self.objects = {}
+        self.requests = {}
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "errors": 0,
+            "uploads": 0,
+            "records": 0,
+            "bytes": 0,
+        }
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def over_quota(self):
+        """Record a request and return whether it exceeds the quota."""
+        if not self.quota:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent_requests and self.recent_requests[0] <= now - 1:
+                self.recent_requests.popleft()
+            if len(self.recent_requests) >= self.quota:
+                return True
+            self.recent_requests.append(now)
+            return False
+
+    def add_request(self, client_request_id, errors):
+        request_id = str(uuid.uuid4())
+        with self.lock:
+            self.requests[client_request_id] = {
+                "requestId": request_id,
+                "clientRequestId": client_request_id,
+                "done_at": time.monotonic() + self.processing_delay,
+                "errors": errors,
+            }
+        return request_id
+
+    def request_status(self, client_request_id):
+        with self.lock:
+            request = self.requests.get(client_request_id)
+        if request is None:
+            return None
+        status = {
+            "requestId": request["requestId"],
+            "clientRequestId": client_request_id,
+        }
+        if time.monotonic() < request["done_at"]:
+            status["status"] = "PROCESSING"
+        elif request["errors"]:
+            status["status"] = "FAILED"
+            status["errors"] = request["errors"]
+        else:
+            status["status"] = "DONE"
+        return status
+
+
+def parse_ldjson(data):
+    """Return the records of an upload and the errors for its invalid lines."""
+    records = []
+    errors = []
+    for line_number, line in enumerate(data.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.append({"line": line_number, "description": f"Invalid JSON: {e}"})
+            continue
+        if not isinstance(record, dict) or "objectId" not in record:
+            errors.append({"line": line_number, "description": "Missing objectId"})
+            continue
+        records.append(record)
+    return records, errors
+
+
+class MockGongHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self):
+        query = parse_qs(urlparse(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, {"requestId": str(uuid.uuid4()), "errors": [message]})
+
+    def _handle(self, method):
+        state = self.state
+        # Always read the body so the connection can be reused.
+        body = self._body()
+        state.count("requests")
+
+        if state.latency or state.latency_jitter:
+            time.sleep(state.latency + random.uniform(0, state.latency_jitter))
+        if state.over_quota() or random.random() < state.throttle_rate:
+            state.count("throttled")
+            self._send(
+                429,
+                {"errors": ["API request limit reached"]},
+                {"Retry-After": str(state.retry_after)},
+            )
+            return
+        if random.random() < state.error_rate:
+            state.count("errors")
+            self._error(500, "Internal server error")
+            return
+        if "Authorization" not in self.headers:
+            self._error(401, "Missing credentials")
+            return
+
+        # Accept any API prefix, such as /v2, in front of the CRM paths.
+        path = urlparse(self.path).path.rstrip("/")
+        path = path[path.find("/crm/") :] if "/crm/" in path else path
+        routes = {
+            ("GET", "/crm/integrations"): self.get_integrations,
+            ("PUT", "/crm/integrations"): self.put_integration,
+            ("DELETE", "/crm/integrations"): self.delete_integration,
+            ("GET", "/crm/entity-schema"): self.get_entity_schema,
+            ("POST", "/crm/entity-schema"): self.post_entity_schema,
+            ("GET", "/crm/entities"): self.get_entities,
+            ("POST", "/crm/entities"): self.post_entities,
+            ("GET", "/crm/request-status"): self.get_request_status,
+        }
+        route = routes.get((method, path))
+        if route is None:
+            self._error(404, f"No route for {method} {path}")
+            return
+        route(self._params(), body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def get_integrations(self, params, body):
+        with self.state.lock:
+            integrations = list(self.state.integrations.values())
+        self._send(200, {"requestId": str(uuid.uuid4()), "integrations": integrations})
+
+    def put_integration(self, params, body):
+        payload = json.loads(body or b"{}")
+        integration_id = str(random.randint(10**17, 10**18 - 1))
+        with self.state.lock:
+            self.state.integrations[integration_id] = {
+                "integrationId": integration_id,
+                "name": payload.get("name"),
+                "ownerEmail": payload.get("ownerEmail"),
+            }
+        self._send(
+            200, {"requestId": str(uuid.uuid4()), "integrationId": integration_id}
+        )
+
+    def delete_integration(self, params, body):
+        with self.state.lock:
+            integration = self.state.integrations.pop(params.get("integrationId"), None)
+        if integration is None:
+            self._error(400, "Unknown integrationId")
+            return
+        self._send(201, {"requestId": str(uuid.uuid4())})
+
+    def get_entity_schema(self, params, body):
+        object_type = params.get("objectType")
+        with self.state.lock:
+            fields = self.state.schemas.get((params.get("integrationId"), object_type))
+        self._send(
+            200,
+            {
+                "requestId": str(uuid.uuid4()),
+                "objectTypeToSelectedFields": {object_type: fields or []},
+            },
+        )
+
+    def post_entity_schema(self, params, body):
+        key = (params.get("integrationId"), params.get("objectType"))
+        with self.state.lock:
+            self.state.schemas[key] = json.loads(body or b"[]")
+        self._send(201, {"requestId": str(uuid.uuid4())})
+
+    def get_entities(self, params, body):
+        key = (params.get("integrationId"), params.get("objectType"))
+        object_ids = json.loads(body) if body else []
+        with self.state.lock:
+            objects = self.state.objects.get(key, {})
+            found = {object_id: objects.get(object_id) for object_id in object_ids}
+        self._send(
+            200,
+            {
+                "requestId": str(uuid.uuid4()),
+                "crmObjectsMap": {
+                    object_id: (
+                        {"crmObjects": {object_id: {"crmObjects": record}}}
+                        if record is not None
+                        else None
+                    )
+                    for object_id, record in found.items()
+                },
+            },
+        )
+
+    def post_entities(self, params, body):
+        client_request_id = params.get("clientRequestId")
+        if not client_request_id:
+            self._error(400, "clientRequestId is required")
+            return
+        with self.state.lock:
+            duplicate = client_request_id in self.state.requests
+        if duplicate:
+            self._error(409, f"clientRequestId {client_request_id} was already used")
+            return
+
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+            + body
+        )
+        parts = [
+            part
+            for part in message.iter_parts()
+            if part.get_param("name", header="content-disposition") == "dataFile"
+        ]
+        if not parts:
+            self._error(400, "dataFile is required")
+            return
+        data = parts[0].get_payload(decode=True)
+        records, errors = parse_ldjson(data)
+
+        self.state.count("uploads")
+        self.state.count("records", len(records))
+        self.state.count("bytes", len(data))
+        if self.state.store_objects:
+            key = (params.get("integrationId"), params.get("objectType"))
+            with self.state.lock:
+                objects = self.state.objects.setdefault(key, {})
+                for record in records:
+                    if record.get("isDeleted"):
+                        objects.pop(record["objectId"], None)
+                    else:
+                        objects[record["objectId"]] = record
+
+        request_id = self.state.add_request(client_request_id, errors)
+        self._send(201, {"requestId": request_id, "clientRequestId": client_request_id})
+
+    def get_request_status(self, params, body):
+        status = self.state.request_status(params.get("clientRequestId"))
+        if status is None:
+            self._error(400, "Unknown clientRequestId")
+            return
+        self._send(200, status)
+
+
+def create_server(host="127.0.0.1", port=0, **options):
+    """
+    Create a mock Gong server bound to `host` and `port`.
+
+    Port 0 picks a free port; the API URL to give GongService is
+    `http://{host}:{server.server_port}/v2`. `options` are passed to
+    MockGongState and the state is available as `server.state`.
+    """
+    state = MockGongState(**options)
+    handler = type("Handler", (MockGongHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def main():
+    """
+    Run a local stand-in for the Gong CRM API.
+
+    Implements the integrations, entity-schema, entities and request-status
+    endpoints used by GongService, with optional latency, server errors and
+    429 throttling. Point GONG_API_URL at the printed URL; any credentials are
+    accepted.
+
+    Arguments:
+    - --host (str, optional): Interface to listen on. Defaults to 127.0.0.1.
+    - --port (int, optional): Port to listen on. Defaults to 8081.
+    - --latency (float, optional): Seconds added to every response.
+    - --latency_jitter (float, optional): Random extra seconds, up to this much, added to every response.
+    - --error_rate (float, optional): Fraction of requests answered with a 500.
+    - --throttle_rate (float, optional): Fraction of requests answered with a 429.
+    - --retry_after (int, optional): Retry-After seconds sent with a 429.
+    - --quota (int, optional): Requests per second served before answering with 429s.
+    - --processing_delay (float, optional): Seconds an upload is reported as PROCESSING.
+    - --no_store (flag, optional): Validate uploads without keeping the objects.
+    """
+    parser = argparse.ArgumentParser(description="Mock Gong CRM API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency_jitter", type=float, default=0.0)
+    parser.add_argument("--error_rate", type=float, default=0.0)
+    parser.add_argument("--throttle_rate", type=float, default=0.0)
+    parser.add_argument("--retry_after", type=int, default=1)
+    parser.add_argument("--quota", type=int)
+    parser.add_argument("--processing_delay", type=float, default=0.0)
+    parser.add_argument("--no_store", action="store_true")
+    args = parser.parse_args()
+
+    server = create_server(
+        args.host,
+        args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        quota=args.quota,
+        processing_delay=args.processing_delay,
+        store_objects=not args.no_store,
+    )
+    print(f"Mock Gong API listening on http://{args.host}:{server.server_port}/v2")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.state.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import threading
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+
+# Tokens are signed with a throwaway key unless one is configured.
+os.environ.setdefault("SECRET_KEY", "tests")
+# Writes are tested with their outbox entries, as deployments syncing to Gong
+# record them.
+os.environ.setdefault("GONG_OUTBOX_ENABLED", "true")
+
+from app.app import app
+from app.api.security import create_access_token
+from app.db.database import Base, get_db, track_queries
+from app.db.models import RoleEnum, User
+from app.services.gong_service import GongService
+from app.services.http_client import create_http_session
+from scripts.benchmark_gong_sync import seed
+from scripts.mock_gong_server import create_server
+
+
+@pytest.fixture
+def seeded_rows():
+    """Rows seeded per entity; parametrize a test on `seeded_rows` to change it."""
+    return 1000
+
+
+@pytest.fixture
+def engine(tmp_path, seeded_rows):
+    """
+    Engine of a new SQLite database seeded with `seeded_rows` rows per entity.
+
+    The first seeded user is an admin.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/seeded.db")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        seed(session, seeded_rows)
+        session.execute(update(User).where(User.id == 1).values(role=RoleEnum.admin))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    """
+    TestClient of the app on the seeded database, as the admin user.
+
+    The endpoint that handled the last request is kept as `client.endpoint`.
+    """
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_test_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def app_recording_endpoint(scope, receive, send):
+        await app(scope, receive, send)
+        # The router sets the endpoint that handled the request on the scope.
+        client.endpoint = scope.get("endpoint")
+
+    app.dependency_overrides[get_db] = get_test_db
+    client = TestClient(app_recording_endpoint)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': 'user1'})}"
+    yield client
+    app.dependency_overrides.clear()
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the SQL statements run inside the block, as a QueryStats.
+
+    Requests made through the TestClient run in the block's context, so their
+    statements are counted, authentication included.
+    """
+    with track_queries() as stats:
+        yield stats
+
+
+@pytest.fixture
+def mock_gong():
+    """A mock Gong server on a free port, as `scripts/mock_gong_server.py` runs."""
+    server = create_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def gong_service(engine, mock_gong):
+    """GongService pushing the seeded database to the mock Gong server."""
+    http = create_http_session()
+    with sessionmaker(bind=engine)() as session:
+        yield GongService(
+            f"http://127.0.0.1:{mock_gong.server_port}/v2",
+            ("tests", "tests"),
+            "http://localhost:8000",
+            session,
+            http=http,
+        )
+    http.close()
@@ -0,0 +1,19 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_mock_engine
+from sqlalchemy.orm import Session
+from app.api.bulk import upsert_records
+from app.db import models
+from app.api.schemas import CompanyCreate
+
+
+def test_upsert_refuses_databases_without_on_conflict():
+    engine = create_mock_engine("mysql://", lambda *args, **kwargs: None)
+    valid = {0: CompanyCreate(name="Acme", industry="technology")}
+
+    with pytest.raises(HTTPException) as raised:
+        upsert_records(
+            Session(bind=engine), models.Company, valid, {}, exclude={"domains"}
+        )
+
+    assert raised.value.status_code == 501
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Company, GongRecordFingerprint, GongRequest
+from app.services.gong_ledger import GongRequestPoller
+
+
+@pytest.fixture
+def seeded_rows():
+    return 10
+
+
+def pushed_objects(mock_gong, integration_id, object_type):
+    return mock_gong.state.objects.get((str(integration_id), object_type), {})
+
+
+def test_full_dump_pushes_rows_without_updated_at(gong_service, mock_gong):
+    session = gong_service.session
+    session.execute(update(Company).where(Company.id == 3).values(updated_at=None))
+    session.commit()
+    created_at = session.get(Company, 3).created_at
+    integration_id = gong_service.register_crm_integration("Tests", "t@example.com")
+
+    gong_service.full_db_dump(integration_id)
+
+    accounts = pushed_objects(mock_gong, integration_id, "ACCOUNT")
+    assert len(accounts) == 10
+    assert accounts["3"]["modifiedDate"].startswith(
+        created_at.replace(microsecond=0).isoformat()
+    )
+
+
+def test_incremental_sync_pushes_rows_without_updated_at(gong_service, mock_gong):
+    session = gong_service.session
+    integration_id = gong_service.register_crm_integration("Tests", "t@example.com")
+    gong_service.incremental_sync(integration_id)
+    session.add(Company(name="Unstamped", industry="technology"))
+    session.commit()
+    company = session.query(Company).filter(Company.name == "Unstamped").one()
+    company_id = company.id
+    session.execute(
+        update(Company).where(Company.id == company_id).values(updated_at=None)
+    )
+    session.commit()
+
+    gong_service.incremental_sync(integration_id)
+
+    assert str(company_id) in pushed_objects(mock_gong, integration_id, "ACCOUNT")
+
+
+def test_failed_request_is_pushed_again(engine, gong_service, mock_gong):
+    session = gong_service.session
+    integration_id = gong_service.register_crm_integration("Tests", "t@example.com")
+    gong_service.incremental_sync(integration_id)
+    request = session.query(GongRequest).filter_by(object_type="ACCOUNT").one()
+    mock_gong.state.requests[request.client_request_id].update(
+        done_at=0, errors=[{"line": 1, "description": "Rejected"}]
+    )
+
+    poller = GongRequestPoller(sessionmaker(bind=engine), lambda session: gong_service)
+    poller.poll_once()
+
+    session.refresh(request)
+    assert request.status == "FAILED"
+    assert (
+        not session.query(GongRecordFingerprint)
+        .filter_by(integration_id=str(integration_id), object_type="ACCOUNT")
+        .count()
+    )
+    # Touch the companies without changing them, as dedupe would skip them.
+    session.execute(update(Company).values(updated_at=datetime.now(timezone.utc)))
+    session.commit()
+    mock_gong.state.objects.clear()
+    gong_service.incremental_sync(integration_id)
+    assert len(pushed_objects(mock_gong, integration_id, "ACCOUNT")) == 10
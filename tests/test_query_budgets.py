@@ -0,0 +1,315 @@
+import pytest
+from fastapi.routing import APIRoute
+from app.api.routes import auth, companies, contacts, deals, gong, leads, users
+from tests.conftest import count_queries
+
+# Requests exercising each route, in order. `{id}` is an ID present in the
+# seeded tables and `{created}` the ID of the record the last POST to the same
+# collection created. A request may name the status it expects, 200 otherwise.
+# Routes calling the Gong API are left out.
+ROUTE_REQUESTS = [
+    (
+        "POST",
+        "/users/",
+        {
+            "json": {
+                "username": "budget",
+                "email": "budget@example.com",
+                "phone": "+15550000000",
+                "first_name": "Budget",
+                "last_name": "Check",
+                "password": "budget-check",
+            }
+        },
+    ),
+    (
+        "POST",
+        "/auth/token",
+        {"data": {"username": "budget", "password": "budget-check"}},
+    ),
+    ("POST", "/auth/token/verify", {}),
+    ("POST", "/auth/token/refresh", {}),
+    ("GET", "/users/me", {}),
+    ("GET", "/users/", {}),
+    ("GET", "/users/{id}", {}),
+    (
+        "PUT",
+        "/users/{created}",
+        {
+            "json": {
+                "username": "budget",
+                "email": "budget@example.com",
+                "phone": "+15550000001",
+                "first_name": "Budget",
+                "last_name": "Check",
+            }
+        },
+    ),
+    ("POST", "/users/promote/{id}", {}),
+    ("POST", "/users/disable/{id}", {}),
+    ("POST", "/users/enable/{id}", {}),
+    (
+        "POST",
+        "/companies/",
+        {
+            "json": {
+                "name": "Budget Co",
+                "industry": "technology",
+                "domains": [
+                    {
+                        "id": 0,
+                        "name": "budget.example.com",
+                        "company_id": None,
+                        "created_at": "2024-01-01T00:00:00",
+                        "updated_at": "2024-01-01T00:00:00",
+                    }
+                ],
+            }
+        },
+    ),
+    (
+        "POST",
+        "/companies/bulk",
+        {
+            "json": [
+                {
+                    "name": "Budget Bulk Co",
+                    "industry": "technology",
+                    "domains": [{"name": "budget-bulk.example.com"}],
+                },
+                {"name": "Budget Bulk Co 2", "industry": "finance"},
+            ]
+        },
+    ),
+    ("GET", "/companies/", {}),
+    ("GET", "/companies/{id}", {}),
+    ("GET", "/companies/industry/technology", {}),
+    (
+        "PUT",
+        "/companies/{created}",
+        {
+            "json": {
+                "name": "Budget Co",
+                "industry": "technology",
+                "domains": [],
+            }
+        },
+    ),
+    (
+        "POST",
+        "/contacts/",
+        {
+            "json": {
+                "first_name": "Budget",
+                "last_name": "Check",
+                "email": "budget.contact@example.com",
+                "phone": "+15550000002",
+                "company_id": 1,
+            }
+        },
+    ),
+    (
+        "POST",
+        "/contacts/bulk",
+        {
+            "json": [
+                {
+                    "first_name": "Budget",
+                    "last_name": "Bulk",
+                    "email": f"budget.bulk{index}@example.com",
+                    "phone": "+15550000006",
+                    "company_id": 1,
+                }
+                for index in range(2)
+            ]
+        },
+    ),
+    ("GET", "/contacts/", {}),
+    ("GET", "/contacts/company/{id}", {}),
+    ("GET", "/contacts/{id}", {}),
+    (
+        "PUT",
+        "/contacts/{created}",
+        {
+            "json": {
+                "first_name": "Budget",
+                "last_name": "Check",
+                "email": "budget.contact@example.com",
+                "phone": "+15550000003",
+                "company_id": 1,
+            }
+        },
+    ),
+    (
+        "POST",
+        "/deals/",
+        {
+            "json": {
+                "title": "Budget deal",
+                "amount": 1000,
+                "open_date": "2024-01-01T00:00:00",
+                "company_id": 1,
+                "owner_id": 1,
+                "stage": "prospecting",
+                "status": "open",
+            }
+        },
+    ),
+    (
+        "POST",
+        "/deals/bulk",
+        {
+            "json": [
+                {
+                    "title": "Budget bulk deal",
+                    "amount": 1000,
+                    "open_date": "2024-01-01T00:00:00",
+                    "company_id": 1,
+                    "owner_id": 1,
+                    "stage": "prospecting",
+                    "status": "open",
+                }
+            ]
+            * 2
+        },
+    ),
+    ("GET", "/deals/", {}),
+    ("GET", "/deals/user/{id}", {}),
+    ("GET", "/deals/company/{id}", {}),
+    ("GET", "/deals/stage/prospecting", {}),
+    ("GET", "/deals/status/open", {}),
+    ("GET", "/deals/{id}", {}),
+    (
+        "PUT",
+        "/deals/{created}",
+        {
+            "json": {
+                "title": "Budget deal",
+                "amount": 2000,
+                "open_date": "2024-01-01T00:00:00",
+                "company_id": 1,
+                "owner_id": 1,
+                "stage": "qualification",
+                "status": "open",
+            }
+        },
+    ),
+    (
+        "POST",
+        "/leads/",
+        {
+            "json": {
+                "first_name": "Budget",
+                "last_name": "Check",
+                "company": "Budget Co",
+                "email": "budget.lead@example.com",
+                "phone": "+15550000004",
+                "status": "new",
+                "owner_id": 1,
+            }
+        },
+    ),
+    (
+        "POST",
+        "/leads/bulk",
+        {
+            "json": [
+                {
+                    "first_name": "Budget",
+                    "last_name": "Bulk",
+                    "company": "Budget Co",
+                    "email": f"budget.bulk{index}@example.com",
+                    "phone": "+15550000007",
+                    "status": "new",
+                    "owner_id": 1,
+                }
+                for index in range(2)
+            ]
+        },
+    ),
+    ("GET", "/leads/", {}),
+    ("GET", "/leads/user/{id}", {}),
+    ("GET", "/leads/status/new", {}),
+    ("GET", "/leads/{id}", {}),
+    (
+        "PUT",
+        "/leads/{created}",
+        {
+            "json": {
+                "first_name": "Budget",
+                "last_name": "Check",
+                "company": "Budget Co",
+                "email": "budget.lead@example.com",
+                "phone": "+15550000005",
+                "status": "contacted",
+                "owner_id": 1,
+            }
+        },
+    ),
+    ("DELETE", "/leads/{created}", {}),
+    ("DELETE", "/deals/{created}", {}),
+    ("DELETE", "/contacts/{created}", {}),
+    ("DELETE", "/companies/{created}", {}),
+    ("GET", "/gong/jobs/1", {}, 404),
+    ("GET", "/gong/requests", {}),
+    ("GET", "/gong/metrics", {}),
+    ("DELETE", "/users/{created}", {}),
+]
+
+
+ROUTE_MODULES = [auth, users, companies, contacts, deals, leads, gong]
+
+# Endpoints declaring no statement budget with `query_budget(None)`, which
+# exempts them from every check. Only endpoints whose statements grow with the
+# records they sync by design belong here.
+UNBUDGETED_ENDPOINTS = {"incremental_sync", "reconcile"}
+
+
+def api_routes():
+    for module in ROUTE_MODULES:
+        for route in module.router.routes:
+            if isinstance(route, APIRoute):
+                yield module, route
+
+
+@pytest.mark.parametrize(
+    "module, route",
+    [
+        pytest.param(module, route, id=f"{module.__name__}:{route.path}")
+        for module, route in api_routes()
+    ],
+)
+def test_route_declares_budget(module, route):
+    assert hasattr(route.endpoint, "query_budget"), "no query_budget declared"
+    if route.endpoint.query_budget is None:
+        assert (
+            route.endpoint.__name__ in UNBUDGETED_ENDPOINTS
+        ), "declares query_budget(None) without being listed as unbudgeted"
+
+
+@pytest.mark.parametrize("seeded_rows", [10, 1000])
+def test_routes_within_budget(client, seeded_rows):
+    """
+    Request every route in ROUTE_REQUESTS and compare its statements with its
+    budget. Budgets must not grow with the rows returned, so a route running
+    more statements on the larger database, such as an N+1 lazy load, fails.
+    """
+    failures = []
+    created = {}
+    seeded_id = max(seeded_rows // 2, 1)
+    for method, path, options, *expected in ROUTE_REQUESTS:
+        collection = path.split("{")[0]
+        path = path.format(id=seeded_id, created=created.get(collection))
+        with count_queries() as stats:
+            response = client.request(method, path, **options)
+        assert response.status_code == (
+            expected[0] if expected else 200
+        ), f"{method} {path}: {response.text}"
+        if method == "POST" and "id" in response.json():
+            created[collection] = response.json()["id"]
+        budget = client.endpoint.query_budget
+        if budget is not None and stats.count > budget:
+            failures.append(
+                f"{method} {path}: {stats.count} statements, budget {budget}"
+            )
+    assert not failures, "\n".join(failures)
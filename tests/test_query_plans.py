@@ -0,0 +1,150 @@
+from urllib.parse import urlencode
+import pytest
+from sqlalchemy import event, text
+from app.app import app
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.security import get_current_active_user, get_current_active_admin
+
+# List routes, the table each one pages through, whether it filters it and the
+# query parameters to send. Routes filtering on a column must find their rows
+# through an index; unfiltered routes may read the table in primary-key order,
+# which stops after `limit` rows.
+LIST_ROUTES = [
+    ("/users/", "users", False, {}),
+    ("/companies/", "companies", False, {}),
+    ("/companies/industry/technology", "companies", True, {}),
+    ("/contacts/", "contacts", False, {}),
+    ("/contacts/company/{company_id}", "contacts", True, {}),
+    ("/deals/", "deals", False, {}),
+    ("/deals/user/{owner_id}", "deals", True, {}),
+    ("/deals/company/{company_id}", "deals", True, {}),
+    ("/deals/stage/prospecting", "deals", True, {}),
+    ("/deals/status/open", "deals", True, {}),
+    ("/leads/", "leads", False, {}),
+    ("/leads/user/{owner_id}", "leads", True, {}),
+    ("/leads/status/new", "leads", True, {}),
+    ("/gong/requests", "gong_requests", False, {}),
+    ("/gong/requests", "gong_requests", True, {"status": "PENDING"}),
+]
+
+
+def plan_problems(plan, table, filtered, cursor):
+    """Return why a query plan would not keep every page as cheap as the first."""
+    problems = []
+    details = [row[-1] for row in plan]
+    if any("USE TEMP B-TREE" in detail for detail in details):
+        problems.append("sorts the matching rows instead of reading them in order")
+    for detail in details:
+        if not detail.startswith(f"SCAN {table}"):
+            continue
+        if cursor:
+            problems.append("scans the table instead of seeking to the cursor")
+        elif filtered and "INDEX" not in detail:
+            problems.append("scans the table instead of using an index")
+    return problems
+
+
+@pytest.mark.parametrize(
+    "plan, table, filtered, cursor, expected",
+    [
+        (
+            [(2, 0, 0, "SEARCH deals USING INDEX ix_deals_stage_id (stage=?)")],
+            "deals",
+            True,
+            True,
+            0,
+        ),
+        ([(2, 0, 0, "SCAN deals")], "deals", True, False, 1),
+        (
+            [(2, 0, 0, "SCAN deals USING INDEX ix_deals_stage_id")],
+            "deals",
+            True,
+            False,
+            0,
+        ),
+        ([(2, 0, 0, "SCAN deals")], "deals", False, False, 0),
+        ([(2, 0, 0, "SCAN deals")], "deals", False, True, 1),
+        (
+            [(2, 0, 0, "SCAN deals"), (3, 0, 0, "USE TEMP B-TREE FOR ORDER BY")],
+            "deals",
+            False,
+            False,
+            1,
+        ),
+    ],
+)
+def test_plan_problems(plan, table, filtered, cursor, expected):
+    assert len(plan_problems(plan, table, filtered, cursor)) == expected
+
+
+@pytest.fixture
+def captured_selects(engine):
+    """SELECT statements run on the seeded database, with their parameters."""
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize(
+    "path, table, filtered, params",
+    [
+        pytest.param(
+            path,
+            table,
+            filtered,
+            params,
+            id=f"{path}?{urlencode(params)}" if params else path,
+        )
+        for path, table, filtered, params in LIST_ROUTES
+    ],
+)
+def test_list_route_uses_index(
+    engine, client, captured_selects, path, table, filtered, params
+):
+    """
+    Page through a list route by `skip` and then by cursor, checking the SQLite
+    query plan of every query it makes on its table.
+    """
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    app.dependency_overrides[get_current_active_admin] = lambda: None
+    with engine.connect() as connection:
+        # Filter on the owner and company with the most rows.
+        owner_id = connection.execute(
+            text("SELECT owner_id FROM deals GROUP BY owner_id ORDER BY count(*) DESC")
+        ).scalar()
+        company_id = connection.execute(
+            text(
+                "SELECT company_id FROM contacts GROUP BY company_id "
+                "ORDER BY count(*) DESC"
+            )
+        ).scalar()
+    path = path.format(owner_id=owner_id, company_id=company_id)
+
+    cursor = None
+    # The cursor page is only requested when the first page was full.
+    for page in ("first page", "cursor page"):
+        if page == "cursor page" and cursor is None:
+            break
+        del captured_selects[:]
+        page_params = {"limit": 2, **params}
+        if cursor is not None:
+            page_params["cursor"] = cursor
+        response = client.get(path, params=page_params)
+        assert response.status_code == 200, response.text
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        queries = [query for query in captured_selects if f"FROM {table}" in query[0]]
+        assert queries, f"{page}: no query on {table} captured"
+        with engine.connect() as connection:
+            for statement, parameters in queries:
+                plan = connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).all()
+                problems = plan_problems(plan, table, filtered, page == "cursor page")
+                summary = "; ".join(row[-1] for row in plan)
+                assert not problems, f"{page}: {summary}: {'; '.join(problems)}"